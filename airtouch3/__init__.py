@@ -1,11 +1,13 @@
 """The Air Touch 3 integration."""
 from __future__ import annotations
+import asyncio
+from datetime import timedelta
 import logging
+import time
 
 from airtouch3 import AirTouch3
-from airtouch3 import AT3CommsStatus, AT3Command, AT3AcFanSpeed, AT3AcMode
+from airtouch3 import AT3CommsStatus
 
-from homeassistant.components.climate import SCAN_INTERVAL
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.const import CONF_HOST
@@ -13,7 +15,25 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN
+from . import commands
+from .client import AT3Client
+from .commands import AT3CommandBus
+from .const import (
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_FAST_WINDOW,
+    CONF_IDLE_AFTER,
+    CONF_IDLE_SCAN_INTERVAL,
+    CONF_SCAN_INTERVAL,
+    DATA_SCHEDULER,
+    DEFAULT_FAST_SCAN_INTERVAL,
+    DEFAULT_FAST_WINDOW,
+    DEFAULT_IDLE_AFTER,
+    DEFAULT_IDLE_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
+from .scheduler import AT3Scheduler
+from .snapshot import AT3Snapshot
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,16 +44,20 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Store an API object for your platforms to access
     # hass.data[DOMAIN][entry.entry_id] = MyApi(...)
     hass.data.setdefault(DOMAIN, {})
+    # Every console's requests go through the one scheduler
+    scheduler = hass.data.setdefault(DATA_SCHEDULER, AT3Scheduler())
     host = entry.data[CONF_HOST]
-    at3 = AirTouch3(host)
-    success = at3.update_status()
+    client = AT3Client(host, scheduler=scheduler)
+    success = await client.update_status()
     if not success:
-        raise ConfigEntryNotReady
-    coordinator = AT3DataUpdateCoordinator(hass, at3)
+        await client.close()
+        raise ConfigEntryNotReady(client.at3.comms_error)
+    coordinator = AT3DataUpdateCoordinator(hass, client, entry.options)
     await coordinator.async_config_entry_first_refresh()
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
@@ -41,118 +65,138 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator.commands.close()
+        await coordinator.client.close()
+        if not hass.data[DOMAIN]:
+            hass.data.pop(DATA_SCHEDULER, None)
 
     return unload_ok
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 class AT3DataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching Airtouch3 data."""
 
     CMD = "Command"
-    IDX = "Index"
-    FAN = "Fan"
-    MODE = "Mode"
-    CMD_AC_TOGGLE = "AT3AcUnit.toggle"
-    CMD_AC_TEMP_INC = "AT3AcUnit.temperature_inc"
-    CMD_AC_TEMP_DEC = "AT3AcUnit.temperature_dec"
-    CMD_AC_SET_FAN = "AT3AcUnit.set_fan_speed"
-    CMD_AC_SET_MODE = "AT3AcUnit.set_mode"
-    CMD_GRP_TOGGLE = "AT3Group.toggle"
-    CMD_GRP_TOGGLE_MODE = "AT3Group.toggle_mode"
-    CMD_GRP_POSN_INC = "AT3Group.position_inc"
-    CMD_GRP_POSN_DEC = "AT3Group.position_dec"
-
-    def __init__(self, hass, at3):
+    IDX = commands.ARG_INDEX
+    FAN = commands.ARG_FAN
+    MODE = commands.ARG_MODE
+    TEMP = commands.ARG_TEMP
+    POSITION = commands.ARG_POSITION
+    CMD_AC_TOGGLE = commands.CMD_AC_TOGGLE
+    CMD_AC_TEMP_INC = commands.CMD_AC_TEMP_INC
+    CMD_AC_TEMP_DEC = commands.CMD_AC_TEMP_DEC
+    CMD_AC_SET_FAN = commands.CMD_AC_SET_FAN
+    CMD_AC_SET_MODE = commands.CMD_AC_SET_MODE
+    CMD_GRP_TOGGLE = commands.CMD_GRP_TOGGLE
+    CMD_GRP_TOGGLE_MODE = commands.CMD_GRP_TOGGLE_MODE
+    CMD_GRP_POSN_INC = commands.CMD_GRP_POSN_INC
+    CMD_GRP_POSN_DEC = commands.CMD_GRP_POSN_DEC
+    CMD_AC_SET_TEMP = commands.CMD_AC_SET_TEMP
+    CMD_GRP_SET_TEMP = commands.CMD_GRP_SET_TEMP
+    CMD_GRP_SET_POSN = commands.CMD_GRP_SET_POSN
+
+    def __init__(self, hass, client: AT3Client, options=None):
         """Initialize global Airtouch data updater."""
-        self.at3: AirTouch3 = at3
+        self.client = client
+        self.at3: AirTouch3 = client.at3
+
+        options = options or {}
+        self._fast_scan_interval = timedelta(
+            seconds=options.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL)
+        )
+        self._fast_window = options.get(CONF_FAST_WINDOW, DEFAULT_FAST_WINDOW)
+        self._scan_interval = timedelta(
+            seconds=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        )
+        self._idle_after = options.get(CONF_IDLE_AFTER, DEFAULT_IDLE_AFTER)
+        self._idle_scan_interval = timedelta(
+            seconds=options.get(CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL)
+        )
+        self._last_activity = time.monotonic()
+
+        # Updated in place, with the keys of what changed in the last update
+        self.snapshot = AT3Snapshot()
+        self.changed: set[tuple] = set()
+        # Commands are confirmed by the status the console replies with, or
+        # by a later poll
+        self.commands = AT3CommandBus(
+            client,
+            self.snapshot,
+            lambda: self.async_set_updated_data(self._update_snapshot()),
+        )
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=SCAN_INTERVAL,
+            update_interval=self._fast_scan_interval,
         )
 
-    def issue_command(self, cmd, **kwargs):
-        print(f"Issuing command {cmd} with args {kwargs}")
-        cmd = kwargs.get(self.CMD)
-        idx = kwargs.get(self.IDX)
-        if cmd is None or idx is None:
-            return None
-
-        if cmd == self.CMD_AC_TOGGLE:
-            ac_unit = int(idx)
-            self.at3.toggle_ac_unit(ac_unit)
-
-        if cmd == self.CMD_AC_TEMP_INC:
-            ac_unit = int(idx)
-            self.at3.toggle_temperature_ac_unit(ac_unit, AT3Command.INCREMENT)
-
-        if cmd == self.CMD_AC_TEMP_DEC:
-            ac_unit = int(idx)
-            self.at3.toggle_temperature_ac_unit(ac_unit, AT3Command.DECREMENT)
-
-        if cmd == self.CMD_AC_SET_FAN:
-            ac_unit = int(idx)
-            speed = AT3AcFanSpeed(kwargs.get(self.FAN))
-            self.at3.set_fan_speed_ac_unit(ac_unit, speed)
+    def async_submit_command(self, cmd, **kwargs) -> asyncio.Future:
+        """Queue a command for the console, returning a future that resolves
+        True once a status confirms the change, or False if it fails"""
+        _LOGGER.debug("Issuing command %s with args %s", cmd, kwargs)
+        idx = kwargs.pop(self.IDX, None)
+        if idx is None:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(False)
+            return future
+        self._last_activity = time.monotonic()
+        return self.commands.submit(cmd, int(idx), **kwargs)
+
+    async def async_issue_command(self, cmd, **kwargs) -> bool:
+        """Send a command, returning once the console confirms it"""
+        return await self.async_submit_command(cmd, **kwargs)
+
+    async def async_set_ac_temperature(self, ac_unit: int, temperature: int) -> bool:
+        """Step the setpoint of the AC unit to the temperature"""
+        return await self.async_issue_command(
+            self.CMD_AC_SET_TEMP, **{self.IDX: ac_unit, self.TEMP: temperature}
+        )
 
-        if cmd == self.CMD_AC_SET_MODE:
-            ac_unit = int(idx)
-            mode = AT3AcMode(kwargs.get(self.MODE))
-            self.at3.set_mode_ac_unit(ac_unit, mode)
+    async def async_set_group_temperature(self, group: int, temperature: int) -> bool:
+        """Step the setpoint of a temperature controlled group to the temperature"""
+        return await self.async_issue_command(
+            self.CMD_GRP_SET_TEMP, **{self.IDX: group, self.TEMP: temperature}
+        )
 
-        self.data = self._create_data_dict()
+    async def async_set_group_position(self, group: int, percent: int) -> bool:
+        """Step the position of an open group to the percent"""
+        return await self.async_issue_command(
+            self.CMD_GRP_SET_POSN, **{self.IDX: group, self.POSITION: percent}
+        )
 
     async def _async_update_data(self):
         """Fetch data from Airtouch3."""
-        self.at3.update_status()
+        await self.client.update_status()
         if self.at3.comms_status != AT3CommsStatus.OK:
-            raise UpdateFailed("Airtouch connection issue")
-
-        return self._create_data_dict()
-
-    def _create_data_dict(self):
-
-        data = {
-            "name": self.at3.name,
-            "id": self.at3.id,
-            "ac_units": {
-                ac.number: {
-                    "name": ac.name,
-                    "number": ac.number,
-                    "brand": ac.brand,
-                    "fan_speed": ac.fan_speed,
-                    "has_error": ac.has_error,
-                    "is_on": ac.is_on,
-                    "mode": ac.mode,
-                    "temperature": ac.temperature,
-                    "temperature_sp": ac.temperature_sp,
-                }
-                for ac in self.at3.ac_units.values()
-            },
-            "groups": {
-                gr.number: {
-                    "name": gr.name,
-                    "number": gr.number,
-                    "is_on": gr.is_on,
-                    "mode": gr.mode,
-                    "open_percent": gr.open_percent,
-                    "temperature": gr.temperature,
-                    "temperature_sp": gr.temperature_sp,
-                }
-                for gr in self.at3.groups.values()
-            },
-            "sensors": {
-                se.name: {
-                    "name": se.name,
-                    "temperature": se.temperature,
-                    "available": se.available,
-                    "low_battery": se.low_battery,
-                }
-                for se in self.at3.sensors.values()
-            },
-        }
-
-        return data
+            raise UpdateFailed(f"Airtouch connection issue: {self.at3.comms_error}")
+
+        return self._update_snapshot()
+
+    def _update_snapshot(self) -> AT3Snapshot:
+        """Update the snapshot from the last status response, and the poll
+        interval from how recently anything changed"""
+        self.changed = self.snapshot.update(self.at3)
+        if self.changed:
+            self._last_activity = time.monotonic()
+        # A command can be confirmed by a status that changed nothing, ie a
+        # change another made in the meantime
+        self.commands.status_received()
+        self.update_interval = self._poll_interval()
+        return self.snapshot
+
+    def _poll_interval(self) -> timedelta:
+        """Fast after activity, slowing to idle when nothing has changed"""
+        quiet = time.monotonic() - self._last_activity
+        if quiet < self._fast_window:
+            return self._fast_scan_interval
+        if quiet < self._idle_after:
+            return self._scan_interval
+        return self._idle_scan_interval
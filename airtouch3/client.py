@@ -0,0 +1,212 @@
+"""Asyncio client for the AirTouch 3 console."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from airtouch3 import AirTouch3, AT3AcFanSpeed, AT3AcMode, AT3CommsStatus
+from airtouch3 import constants as at3_const
+from airtouch3.helper import calculate_checksum
+
+from .const import AT3_PORT, CONNECT_TIMEOUT, REQUEST_TIMEOUT
+from .scheduler import AT3Scheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AT3Client:
+    """Talk to an AirTouch 3 console over one persistent TCP connection.
+
+    Every request, status or command, is answered with the full status
+    response, which is parsed into the AirTouch3 object of the library so the
+    rest of the integration can keep reading its groups, AC units and sensors.
+    Requests are serialised, the console only handles one at a time, and run
+    through the scheduler shared with the other consoles.
+    """
+
+    def __init__(
+        self, host: str, port: int = AT3_PORT, scheduler: AT3Scheduler = None
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.scheduler = scheduler or AT3Scheduler()
+        self.at3 = AirTouch3(host)
+
+        # The library holds these as class attributes, shared by all instances
+        self.at3.groups = {}
+        self.at3.ac_units = {}
+        self.at3.sensors = {}
+
+        self._reader: asyncio.StreamReader = None
+        self._writer: asyncio.StreamWriter = None
+        self._lock = asyncio.Lock()
+        # Until the console shows it cannot queue back to back requests
+        self._pipelining = True
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def update_status(self) -> bool:
+        """Read the status of the console"""
+        return await self.send(at3_const.CMD_1_STATUS, 0, 0, 0)
+
+    async def toggle_ac_unit(self, ac_unit: int) -> bool:
+        return await self.send(
+            at3_const.CMD_1_AC_CTRL, ac_unit, at3_const.CMD_4_TOGGLE, 0
+        )
+
+    async def step_temperature_ac_unit(
+        self, ac_unit: int, increment: bool, count: int = 1
+    ) -> bool:
+        cmd = at3_const.CMD_4_AC_TEMP_INC if increment else at3_const.CMD_4_AC_TEMP_DEC
+        return await self.send(at3_const.CMD_1_AC_CTRL, ac_unit, cmd, 0, count)
+
+    async def set_fan_speed_ac_unit(self, ac_unit: int, speed: AT3AcFanSpeed) -> bool:
+        return await self.send(
+            at3_const.CMD_1_AC_CTRL, ac_unit, at3_const.CMD_4_AC_FAN_SPD, speed.value
+        )
+
+    async def set_mode_ac_unit(self, ac_unit: int, mode: AT3AcMode) -> bool:
+        return await self.send(
+            at3_const.CMD_1_AC_CTRL, ac_unit, at3_const.CMD_4_AC_MODE, mode.value
+        )
+
+    async def toggle_group(self, group: int) -> bool:
+        return await self.send(
+            at3_const.CMD_1_GRP_CTRL, group, at3_const.CMD_4_TOGGLE, 0
+        )
+
+    async def toggle_group_mode(self, group: int) -> bool:
+        return await self.send(
+            at3_const.CMD_1_GRP_CTRL, group, at3_const.CMD_4_TOGGLE, 1
+        )
+
+    async def step_position_group(
+        self, group: int, increment: bool, count: int = 1
+    ) -> bool:
+        """Step the position 5%, or the setpoint 1 degree when the group is
+        under temperature control"""
+        cmd = at3_const.CMD_4_GRP_POSINC if increment else at3_const.CMD_4_GRP_POSDEC
+        return await self.send(
+            at3_const.CMD_1_GRP_CTRL, group, cmd, at3_const.CMD_5_GRP_POS, count
+        )
+
+    async def send(
+        self, byte1: int, byte3: int, byte4: int, byte5: int, count: int = 1
+    ) -> bool:
+        """Send a request and parse the status response, returning if valid.
+        A count above one pipelines that many of the request, only the reply
+        to the last is parsed"""
+        data = [at3_const.CMD_0, byte1, at3_const.CMD_2, byte3, byte4, byte5]
+        data.extend([0] * 6)
+        request = bytes(data) + calculate_checksum(data)
+
+        async with self._lock:
+            if delay := self.scheduler.backoff(self.host, self.port):
+                self.at3.comms_status = AT3CommsStatus.NOT_CONNECTED
+                self.at3.comms_error = f"Not answering, retrying in {delay:.0f}s"
+                return False
+            async with self.scheduler.slots:
+                response = await self._request(request, count)
+
+        if response is None or not self.at3._process_response(response):
+            self.scheduler.record(self.host, self.port, False)
+            self.at3.comms_status = AT3CommsStatus.ERROR
+            return False
+
+        self.scheduler.record(self.host, self.port, True)
+        self.at3.comms_status = AT3CommsStatus.OK
+        self.at3.comms_error = ""
+        return True
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._disconnect()
+
+    async def _request(self, request: bytes, count: int = 1) -> bytes:
+        """Send the request count times, returning the last reply. The
+        requests are pipelined when the console takes that, else, and after a
+        short or missing reply to pipelined requests, the rest are sent one at
+        a time. Once one at a time works after pipelining did not, the console
+        is not sent pipelined requests again"""
+        fell_back = False
+        if count > 1 and self._pipelining:
+            response, replies = await self._exchange(request, count)
+            if replies == count:
+                return response
+            count -= replies
+            fell_back = True
+
+        response = None
+        for _ in range(count):
+            response, replies = await self._exchange(request, 1)
+            if not replies:
+                return None
+            if fell_back:
+                _LOGGER.debug(
+                    "AirTouch 3 %s does not answer pipelined requests", self.host
+                )
+                self._pipelining = False
+                fell_back = False
+        return response
+
+    async def _exchange(self, request: bytes, count: int) -> tuple[bytes, int]:
+        """Send the request count times on the open connection, returning the
+        last reply and the number of replies. Reconnects once if the console
+        had closed the connection, nothing is resent once a reply has started"""
+        response = None
+        replies = 0
+        reused = self.connected
+        for _ in range(2):
+            try:
+                await self._connect()
+                self._writer.write(request * count)
+                await self._writer.drain()
+                while replies < count:
+                    response = await asyncio.wait_for(
+                        self._reader.readexactly(at3_const.RESPONSE_LEN),
+                        REQUEST_TIMEOUT,
+                    )
+                    replies += 1
+                    reused = False
+                return response, replies
+            except asyncio.IncompleteReadError as err:
+                await self._disconnect()
+                self._set_error(err)
+                if not reused or err.partial:
+                    break
+            except ConnectionError as err:
+                await self._disconnect()
+                self._set_error(err)
+                if not reused:
+                    break
+            except (OSError, asyncio.TimeoutError) as err:
+                await self._disconnect()
+                self._set_error(err)
+                break
+            reused = False
+        return response, replies
+
+    async def _connect(self) -> None:
+        if self.connected:
+            return
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), CONNECT_TIMEOUT
+        )
+
+    async def _disconnect(self) -> None:
+        writer = self._writer
+        self._reader = self._writer = None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    def _set_error(self, err: Exception) -> None:
+        _LOGGER.debug("AirTouch 3 %s request failed: %r", self.host, err)
+        self.at3.comms_status = AT3CommsStatus.NOT_CONNECTED
+        self.at3.comms_error = str(err) or type(err).__name__
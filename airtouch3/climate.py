@@ -1,5 +1,4 @@
 from typing import Any
-import asyncio
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import (
@@ -14,14 +13,10 @@ from homeassistant.components.climate.const import (
     FAN_FOCUS,
 )
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
-from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-    CoordinatorEntity,
-)
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from airtouch3 import (
     AirTouch3,
@@ -32,7 +27,9 @@ from airtouch3 import (
     AT3AcFanSpeed,
 )
 
+from . import AT3DataUpdateCoordinator
 from .const import DOMAIN
+from .entity import AT3Entity
 
 import logging
 
@@ -108,109 +105,78 @@ async def async_setup_entry(
         async_add_entities(new_entities)
 
 
-class AT3GroupClimate(CoordinatorEntity, ClimateEntity):
+class AT3GroupClimate(AT3Entity, ClimateEntity):
+
+    # Climate entity defined attributes
+    _attr_hvac_modes = [HVACMode.HEAT_COOL, HVACMode.FAN_ONLY, HVACMode.OFF]
+    _attr_temperature_unit = UnitOfTemperature.CELSIUS
+    _attr_target_temperature_step = 1.0
+
     def __init__(self, coordinator, group: AT3Group):
-        super().__init__(coordinator)
-        self._number = group.number
-        self._toggle = group.toggle
-        self._toggle_mode = group.toggle_mode
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info for this device."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["id"])},
-            name=self.coordinator.data["name"],
-            manufacturer="Polyaire",
-            model="Airtouch 3",
+        super().__init__(coordinator, ("groups", group.number))
+        at3_id = coordinator.data.id
+        self._attr_unique_id = f"at3_{at3_id}_group_{self._number}_climate"
+
+    def _update_attrs(self) -> None:
+        group = self._data
+        self._attr_name = group.name
+        self._attr_current_temperature = group.temperature
+        self._attr_target_temperature = self._optimistic(
+            "temperature_sp", group.temperature_sp
         )
 
-    @property
-    def name(self):
-        """Return the name for this device."""
-        return self.coordinator.data["groups"][self._number]["name"]
-
-    @property
-    def unique_id(self):
-        """Return unique ID for this device."""
-        id = self.coordinator.data["id"]
-        return f"at3_{id}_group_{self._number}_climate"
-
-    @property
-    def temperature_unit(self):
-        """Return the unit of measurement."""
-        return UnitOfTemperature.CELSIUS
-
-    @property
-    def current_temperature(self):
-        """Return the current temperature."""
-        return self.coordinator.data["groups"][self._number]["temperature"]
-
-    @property
-    def target_temperature(self):
-        """Return the temperature we try to reach."""
-        return self.coordinator.data["groups"][self._number]["temperature_sp"]
-
-    @property
-    def target_temperature_step(self):
-        """Return the supported step of target temperature."""
-        return 1.0
-
-    @property
-    def hvac_mode(self):
-        """Return hvac target hvac state."""
-        # there are other power states that aren't 'on' but still count as on (eg. 'Turbo')
-        # on and temp control = Auto
-        # on and position control = Fan
-        # otherwise off
-        mode = self.coordinator.data["groups"][self._number]["mode"]
-        is_on = self.coordinator.data["groups"][self._number]["is_on"]
-        if is_on:
-            if mode == AT3GroupMode.TEMPERATURE:
-                return HVACMode.HEAT_COOL
-            else:
-                return HVACMode.FAN_ONLY
-        return HVACMode.OFF
-
-    @property
-    def hvac_modes(self):
-        """Return the list of available operation modes."""
-        return [HVACMode.HEAT_COOL, HVACMode.FAN_ONLY, HVACMode.OFF]
-
-    @property
-    def supported_features(self):
-        """Return the list of supported features."""
-        mode = self.coordinator.data["groups"][self._number]["mode"]
-        if mode == AT3GroupMode.TEMPERATURE:
-            return ClimateEntityFeature.TARGET_TEMPERATURE
-        return 0
+        # On and temperature control is heat/cool, on and position control is
+        # fan only, otherwise off
+        if not group.is_on:
+            self._attr_hvac_mode = HVACMode.OFF
+        elif group.mode == AT3GroupMode.TEMPERATURE:
+            self._attr_hvac_mode = HVACMode.HEAT_COOL
+        else:
+            self._attr_hvac_mode = HVACMode.FAN_ONLY
+
+        if group.mode == AT3GroupMode.TEMPERATURE:
+            self._attr_supported_features = ClimateEntityFeature.TARGET_TEMPERATURE
+        else:
+            self._attr_supported_features = ClimateEntityFeature(0)
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
-        is_on = self.coordinator.data["groups"][self._number]["is_on"]
-        mode = self.coordinator.data["groups"][self._number]["mode"]
+        is_on = self.coordinator.data.groups[self._number].is_on
+        mode = self.coordinator.data.groups[self._number].mode
         if hvac_mode == HVACMode.OFF and is_on:
-            self._toggle()
+            await self._command(AT3DataUpdateCoordinator.CMD_GRP_TOGGLE)
         elif hvac_mode == HVACMode.HEAT_COOL or hvac_mode == HVACMode.FAN_ONLY:
             if not is_on:
-                self._toggle()
+                await self._command(AT3DataUpdateCoordinator.CMD_GRP_TOGGLE)
             if hvac_mode == HVACMode.HEAT_COOL and mode == AT3GroupMode.PERECENT:
-                self._toggle_mode()
+                await self._command(AT3DataUpdateCoordinator.CMD_GRP_TOGGLE_MODE)
             if hvac_mode == HVACMode.FAN_ONLY and mode == AT3GroupMode.TEMPERATURE:
-                self._toggle_mode()
-
-        await self.coordinator.async_refresh()
+                await self._command(AT3DataUpdateCoordinator.CMD_GRP_TOGGLE_MODE)
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
         temp = kwargs.get(ATTR_TEMPERATURE)
         if temp is None or temp == self.target_temperature:
             return
-        # TODO await self._group.toggle temp up or down
-        await self.coordinator.async_refresh()
+
+        # Setpoint is only adjustable under temperature control
+        if self.coordinator.data.groups[self._number].mode != AT3GroupMode.TEMPERATURE:
+            return
+        self._async_set_pending("temperature_sp", int(temp))
+
+    async def _async_apply_pending(self, pending):
+        """Send the net setpoint change"""
+        if (temp := pending.get("temperature_sp")) is not None:
+            await self.coordinator.async_set_group_temperature(self._number, temp)
+
+    async def _command(self, cmd: str) -> bool:
+        """Issue a command for this group, the data is updated from the reply"""
+        return await self.coordinator.async_issue_command(
+            cmd, **{AT3DataUpdateCoordinator.IDX: self._number}
+        )
 
 
-class AT3AcUnitClimate(CoordinatorEntity, ClimateEntity):
+class AT3AcUnitClimate(AT3Entity, ClimateEntity):
 
     # Climate entity defined attributes
     _attr_fan_modes = [FAN_LOW, FAN_MEDIUM, FAN_HIGH]
@@ -219,86 +185,48 @@ class AT3AcUnitClimate(CoordinatorEntity, ClimateEntity):
     _attr_target_temperature_step = 1.0
 
     def __init__(self, coordinator, ac_unit: AT3AcUnit):
-        super().__init__(coordinator)
-        self._number = ac_unit.number
-        self._temperature_inc = ac_unit.temperature_inc
-        self._temperature_dec = ac_unit.temperature_dec
-        self._toggle = ac_unit.toggle
-        self._set_mode = ac_unit.set_mode
-        self._set_fan_speed = ac_unit.set_fan_speed
-
-        ac_id = self.coordinator.data["id"]
-
-        self._attr_name = self.coordinator.data["ac_units"][self._number]["name"]
-        self._attr_unique_id = f"at3_{ac_id}_ac_{self._number}"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info for this device."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["id"])},
-            name=self.coordinator.data["name"],
-            manufacturer="Polyaire",
-            model="Airtouch 3",
+        super().__init__(coordinator, ("ac_units", ac_unit.number))
+        self._attr_unique_id = f"at3_{coordinator.data.id}_ac_{self._number}"
+
+    def _update_attrs(self) -> None:
+        ac_data = self._data
+        self._attr_name = ac_data.name
+        self._attr_current_temperature = ac_data.temperature
+        self._attr_target_temperature = self._optimistic(
+            "temperature_sp", ac_data.temperature_sp
+        )
+        self._attr_fan_mode = AT3_TO_HA_FAN_SPEED[
+            self._optimistic("fan_speed", ac_data.fan_speed)
+        ]
+        self._attr_hvac_mode = (
+            AT3_TO_HA_MODE[ac_data.mode] if ac_data.is_on else HVACMode.OFF
         )
 
-    @property
-    def current_temperature(self):
-        """Return the current temperature."""
-        return self.coordinator.data["ac_units"][self._number]["temperature"]
-
-    @property
-    def target_temperature(self):
-        """Return the temperature we try to reach."""
-        return self.coordinator.data["ac_units"][self._number]["temperature_sp"]
-
-    @property
-    def supported_features(self):
-        """Return the list of supported features."""
-        mode = self.coordinator.data["ac_units"][self._number]["mode"]
-
-        # Dry, no features
-        if mode == AT3AcMode.DRY:
-            return 0
-
-        # Fan only
-        if mode == AT3AcMode.FAN:
-            return ClimateEntityFeature.FAN_MODE
-
-        return ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.FAN_MODE
-
-    @property
-    def hvac_mode(self):
-        """Return hvac target hvac state."""
-        ac_data = self.coordinator.data["ac_units"][self._number]
-        if not ac_data["is_on"]:
-            return HVACMode.OFF
-
-        return AT3_TO_HA_MODE[ac_data["mode"]]
-
-    @property
-    def fan_mode(self):
-        """Return fan mode of the AC this group belongs to."""
-        ac_data = self.coordinator.data["ac_units"][self._number]
-        return AT3_TO_HA_FAN_SPEED[ac_data["fan_speed"]]
+        # Dry has no features, fan only just the fan mode
+        if ac_data.mode == AT3AcMode.DRY:
+            self._attr_supported_features = ClimateEntityFeature(0)
+        elif ac_data.mode == AT3AcMode.FAN:
+            self._attr_supported_features = ClimateEntityFeature.FAN_MODE
+        else:
+            self._attr_supported_features = (
+                ClimateEntityFeature.TARGET_TEMPERATURE
+                | ClimateEntityFeature.FAN_MODE
+            )
 
     async def async_set_hvac_mode(self, hvac_mode):
         """Set new target hvac mode."""
         if hvac_mode == HVACMode.OFF:
             await self.async_turn_off()
         else:
-            mode = self._set_mode(HA_MODE_TO_AT[hvac_mode])
-            if mode is not None:
-                self.coordinator.data["ac_units"][self._number]["mode"] = mode
+            await self._command(
+                AT3DataUpdateCoordinator.CMD_AC_SET_MODE,
+                **{AT3DataUpdateCoordinator.MODE: HA_MODE_TO_AT[hvac_mode].value},
+            )
             await self.async_turn_on()
-        await self.coordinator.async_refresh()
 
     async def async_set_fan_mode(self, fan_mode):
-        # TODO Need to write the fan mode
-        fan = self._set_fan_speed(HA_FAN_SPEED_TO_AT[fan_mode])
-        if fan is not None:
-            self.coordinator.data["ac_units"][self._number]["fan_speed"] = fan
-        await self.coordinator.async_refresh()
+        """Set new fan mode."""
+        self._async_set_pending("fan_speed", HA_FAN_SPEED_TO_AT[fan_mode])
 
     async def async_set_temperature(self, **kwargs):
         """Set new target temperature."""
@@ -306,46 +234,34 @@ class AT3AcUnitClimate(CoordinatorEntity, ClimateEntity):
         if temp is None or temp == self.target_temperature:
             return
 
-        ac_data = self.coordinator.data["ac_units"][self._number]
-        temp_sp = ac_data["temperature_sp"]
-        count = 0
-        # Max 20 adjustements should get us to setpoint
-        while count < 20:
-            if temp_sp == temp:
-                break
-            elif temp > temp_sp:
-                temp_sp = self._temperature_inc()
-            elif temp < temp_sp:
-                temp_sp = self._temperature_dec()
-
-            if temp_sp is not None:
-                self.coordinator.data["ac_units"][self._number][
-                    "temperature_sp"
-                ] = temp_sp
-            else:
-                break
-
-            await asyncio.sleep(0.05)
-            count = count + 1
-
-        await self.coordinator.async_refresh()
+        self._async_set_pending("temperature_sp", int(temp))
+
+    async def _async_apply_pending(self, pending):
+        """Send the net fan speed and setpoint changes"""
+        ac_data = self.coordinator.data.ac_units[self._number]
+        fan_speed = pending.get("fan_speed")
+        if fan_speed is not None and fan_speed != ac_data.fan_speed:
+            await self._command(
+                AT3DataUpdateCoordinator.CMD_AC_SET_FAN,
+                **{AT3DataUpdateCoordinator.FAN: fan_speed.value},
+            )
+        if (temp := pending.get("temperature_sp")) is not None:
+            await self.coordinator.async_set_ac_temperature(self._number, temp)
 
     async def async_turn_on(self):
         """Turn on."""
-        ac_data = self.coordinator.data["ac_units"][self._number]
-        if not ac_data["is_on"]:
-            is_on = self._toggle()
-            if is_on is not None:
-                self.coordinator.data["ac_units"][self._number]["is_on"] = is_on
-
-        await self.coordinator.async_refresh()
+        ac_data = self.coordinator.data.ac_units[self._number]
+        if not ac_data.is_on:
+            await self._command(AT3DataUpdateCoordinator.CMD_AC_TOGGLE)
 
     async def async_turn_off(self):
         """Turn off."""
-        ac_data = self.coordinator.data["ac_units"][self._number]
-        if ac_data["is_on"]:
-            is_on = self._toggle()
-            if is_on is not None:
-                self.coordinator.data["ac_units"][self._number]["is_on"] = is_on
-
-        await self.coordinator.async_refresh()
+        ac_data = self.coordinator.data.ac_units[self._number]
+        if ac_data.is_on:
+            await self._command(AT3DataUpdateCoordinator.CMD_AC_TOGGLE)
+
+    async def _command(self, cmd: str, **kwargs) -> bool:
+        """Issue a command for this AC unit, the data is updated from the reply"""
+        return await self.coordinator.async_issue_command(
+            cmd, **{AT3DataUpdateCoordinator.IDX: self._number}, **kwargs
+        )
@@ -0,0 +1,329 @@
+"""Command bus of the AirTouch 3 integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import logging
+from typing import Any
+
+from airtouch3 import AT3AcFanSpeed, AT3AcMode, AT3GroupMode
+
+from .client import AT3Client
+from .const import COMMAND_TIMEOUT, GROUP_POSITION_STEP, STEP_ROUNDS
+from .snapshot import AT3Snapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Command names and their arguments
+CMD_AC_TOGGLE = "AT3AcUnit.toggle"
+CMD_AC_TEMP_INC = "AT3AcUnit.temperature_inc"
+CMD_AC_TEMP_DEC = "AT3AcUnit.temperature_dec"
+CMD_AC_SET_FAN = "AT3AcUnit.set_fan_speed"
+CMD_AC_SET_MODE = "AT3AcUnit.set_mode"
+CMD_GRP_TOGGLE = "AT3Group.toggle"
+CMD_GRP_TOGGLE_MODE = "AT3Group.toggle_mode"
+CMD_GRP_POSN_INC = "AT3Group.position_inc"
+CMD_GRP_POSN_DEC = "AT3Group.position_dec"
+CMD_AC_SET_TEMP = "AT3AcUnit.set_temperature"
+CMD_GRP_SET_TEMP = "AT3Group.set_temperature"
+CMD_GRP_SET_POSN = "AT3Group.set_position"
+
+ARG_INDEX = "Index"
+ARG_FAN = "Fan"
+ARG_MODE = "Mode"
+ARG_TEMP = "Temperature"
+ARG_POSITION = "Position"
+
+
+@dataclass(frozen=True)
+class AT3Command:
+    """How to send a command, and how to tell from the status that the
+    console made the change. The confirmation is built from the state before
+    the command is sent, ie a toggle is confirmed by is_on changing from it.
+    A final command is applied before the console replies, so if the reply
+    does not confirm it the console did not make the change, ie a step at a
+    limit"""
+
+    kind: str
+    send: Callable[[AT3Client, int, dict[str, Any]], Awaitable[bool]]
+    confirm: Callable[[Any, dict[str, Any]], Callable[[Any], bool]]
+    final: bool = False
+
+
+def _changed(field: str):
+    def confirm(before, kwargs):
+        value = getattr(before, field)
+        return lambda state: getattr(state, field) != value
+
+    return confirm
+
+
+def _equals(field: str, arg: str, value_type: type):
+    def confirm(before, kwargs):
+        value = value_type(kwargs[arg])
+        return lambda state: getattr(state, field) == value
+
+    return confirm
+
+
+def _stepped(field: str, increment: bool):
+    def confirm(before, kwargs):
+        value = getattr(before, field)
+        if increment:
+            return lambda state: getattr(state, field) > value
+        return lambda state: getattr(state, field) < value
+
+    return confirm
+
+
+def _group_stepped(increment: bool):
+    """A group step moves the setpoint under temperature control, else the
+    position"""
+
+    def confirm(before, kwargs):
+        field = "temperature_sp"
+        if before.mode != AT3GroupMode.TEMPERATURE:
+            field = "open_percent"
+        return _stepped(field, increment)(before, kwargs)
+
+    return confirm
+
+
+def _reached(field: str, arg: str, step: int):
+    """Within half a step of the target, the nearest the steps can get"""
+
+    def confirm(before, kwargs):
+        target = int(kwargs[arg])
+        return lambda state: round((target - getattr(state, field)) / step) == 0
+
+    return confirm
+
+
+def _step_to(
+    kind: str,
+    field: str,
+    arg: str,
+    step: int,
+    send_steps: Callable[[AT3Client, int, bool, int], Awaitable[bool]],
+):
+    """Send all the steps from the value to the target in one pipelined
+    request. Missed steps are sent again, stopping when a round makes no
+    progress, ie at a limit, the confirmation then tells if it was reached"""
+
+    async def send(client: AT3Client, idx: int, kwargs: dict[str, Any]) -> bool:
+        target = int(kwargs[arg])
+        for _ in range(STEP_ROUNDS):
+            current = getattr(getattr(client.at3, kind)[idx], field)
+            count = round((target - current) / step)
+            if count == 0:
+                break
+            _LOGGER.debug("Stepping %s to %s in %s steps", current, target, count)
+            if not await send_steps(client, idx, count > 0, abs(count)):
+                return False
+            if getattr(getattr(client.at3, kind)[idx], field) == current:
+                break
+        return True
+
+    return send
+
+
+COMMANDS: dict[str, AT3Command] = {
+    CMD_AC_TOGGLE: AT3Command(
+        "ac_units",
+        lambda client, idx, kwargs: client.toggle_ac_unit(idx),
+        _changed("is_on"),
+    ),
+    CMD_AC_TEMP_INC: AT3Command(
+        "ac_units",
+        lambda client, idx, kwargs: client.step_temperature_ac_unit(idx, True),
+        _stepped("temperature_sp", True),
+        final=True,
+    ),
+    CMD_AC_TEMP_DEC: AT3Command(
+        "ac_units",
+        lambda client, idx, kwargs: client.step_temperature_ac_unit(idx, False),
+        _stepped("temperature_sp", False),
+        final=True,
+    ),
+    CMD_AC_SET_FAN: AT3Command(
+        "ac_units",
+        lambda client, idx, kwargs: client.set_fan_speed_ac_unit(
+            idx, AT3AcFanSpeed(kwargs[ARG_FAN])
+        ),
+        _equals("fan_speed", ARG_FAN, AT3AcFanSpeed),
+    ),
+    CMD_AC_SET_MODE: AT3Command(
+        "ac_units",
+        lambda client, idx, kwargs: client.set_mode_ac_unit(
+            idx, AT3AcMode(kwargs[ARG_MODE])
+        ),
+        _equals("mode", ARG_MODE, AT3AcMode),
+    ),
+    CMD_GRP_TOGGLE: AT3Command(
+        "groups",
+        lambda client, idx, kwargs: client.toggle_group(idx),
+        _changed("is_on"),
+    ),
+    CMD_GRP_TOGGLE_MODE: AT3Command(
+        "groups",
+        lambda client, idx, kwargs: client.toggle_group_mode(idx),
+        _changed("mode"),
+    ),
+    CMD_GRP_POSN_INC: AT3Command(
+        "groups",
+        lambda client, idx, kwargs: client.step_position_group(idx, True),
+        _group_stepped(True),
+        final=True,
+    ),
+    CMD_GRP_POSN_DEC: AT3Command(
+        "groups",
+        lambda client, idx, kwargs: client.step_position_group(idx, False),
+        _group_stepped(False),
+        final=True,
+    ),
+    CMD_AC_SET_TEMP: AT3Command(
+        "ac_units",
+        _step_to(
+            "ac_units",
+            "temperature_sp",
+            ARG_TEMP,
+            1,
+            lambda client, idx, increment, count: client.step_temperature_ac_unit(
+                idx, increment, count
+            ),
+        ),
+        _reached("temperature_sp", ARG_TEMP, 1),
+        final=True,
+    ),
+    # Group steps move the setpoint under temperature control, else the
+    # position
+    CMD_GRP_SET_TEMP: AT3Command(
+        "groups",
+        _step_to(
+            "groups",
+            "temperature_sp",
+            ARG_TEMP,
+            1,
+            lambda client, idx, increment, count: client.step_position_group(
+                idx, increment, count
+            ),
+        ),
+        _reached("temperature_sp", ARG_TEMP, 1),
+        final=True,
+    ),
+    CMD_GRP_SET_POSN: AT3Command(
+        "groups",
+        _step_to(
+            "groups",
+            "open_percent",
+            ARG_POSITION,
+            GROUP_POSITION_STEP,
+            lambda client, idx, increment, count: client.step_position_group(
+                idx, increment, count
+            ),
+        ),
+        _reached("open_percent", ARG_POSITION, GROUP_POSITION_STEP),
+        final=True,
+    ),
+}
+
+
+class AT3CommandBus:
+    """Sends the commands of one console in order, each submitted command
+    returns a future that resolves True once a status shows the change, or
+    False if the console did not answer, or did not make the change within
+    COMMAND_TIMEOUT.
+
+    The console answers every command with its status, which on_status is
+    called to apply, that status or any later poll can confirm the command.
+    A command the state already confirms, ie setting the mode the unit is
+    in, is resolved without being sent.
+    """
+
+    def __init__(
+        self,
+        client: AT3Client,
+        snapshot: AT3Snapshot,
+        on_status: Callable[[], None],
+    ) -> None:
+        self._client = client
+        self._snapshot = snapshot
+        self._on_status = on_status
+        self._lock = asyncio.Lock()
+        # Unconfirmed commands, with the unit or group and the test of its
+        # state confirming each
+        self._pending: dict[asyncio.Future, tuple[str, int, Callable]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, name: str, index: int, **kwargs) -> asyncio.Future:
+        """Queue the command to be sent, returning its confirmation"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        command = COMMANDS.get(name)
+        if command is None:
+            _LOGGER.warning("Unknown AirTouch 3 command %s", name)
+            future.set_result(False)
+            return future
+
+        timer = loop.call_later(COMMAND_TIMEOUT, self._resolve, future, False)
+        future.add_done_callback(lambda _: timer.cancel())
+        task = loop.create_task(self._send(command, index, kwargs, future))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return future
+
+    def status_received(self) -> None:
+        """Resolve the commands the snapshot now confirms, called after every
+        status, changed or not"""
+        for future, (kind, index, confirmed) in list(self._pending.items()):
+            state = getattr(self._snapshot, kind).get(index)
+            if state is not None and confirmed(state):
+                self._resolve(future, True)
+
+    def close(self) -> None:
+        """Cancel the queued commands, failing their confirmations"""
+        for task in self._tasks:
+            task.cancel()
+        for future in list(self._pending):
+            self._resolve(future, False)
+
+    async def _send(
+        self,
+        command: AT3Command,
+        index: int,
+        kwargs: dict[str, Any],
+        future: asyncio.Future,
+    ) -> None:
+        try:
+            async with self._lock:
+                if future.done():
+                    return
+                # Confirmed from the state once the earlier commands are done
+                before = getattr(self._snapshot, command.kind).get(index)
+                if before is None:
+                    self._resolve(future, False)
+                    return
+                confirmed = command.confirm(before, kwargs)
+                if confirmed(before):
+                    self._resolve(future, True)
+                    return
+                self._pending[future] = (command.kind, index, confirmed)
+
+                if not await command.send(self._client, index, kwargs):
+                    self._resolve(future, False)
+                    return
+                self._on_status()
+                if command.final:
+                    self._resolve(future, False)
+        except (KeyError, ValueError) as err:
+            _LOGGER.warning("Invalid AirTouch 3 command arguments %s: %s", kwargs, err)
+            self._resolve(future, False)
+        except asyncio.CancelledError:
+            self._resolve(future, False)
+            raise
+
+    def _resolve(self, future: asyncio.Future, confirmed: bool) -> None:
+        self._pending.pop(future, None)
+        if not future.done():
+            future.set_result(confirmed)
@@ -3,11 +3,24 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST
+from homeassistant.core import callback
 
-from airtouch3 import AirTouch3
 from airtouch3 import AT3CommsStatus
 
-from .const import DOMAIN
+from .client import AT3Client
+from .const import (
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_FAST_WINDOW,
+    CONF_IDLE_AFTER,
+    CONF_IDLE_SCAN_INTERVAL,
+    CONF_SCAN_INTERVAL,
+    DEFAULT_FAST_SCAN_INTERVAL,
+    DEFAULT_FAST_WINDOW,
+    DEFAULT_IDLE_AFTER,
+    DEFAULT_IDLE_SCAN_INTERVAL,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+)
 
 DATA_SCHEMA = vol.Schema({vol.Required(CONF_HOST): str})
 
@@ -17,6 +30,12 @@ class AirtouchConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return AirtouchOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
         if user_input is None:
@@ -27,8 +46,10 @@ class AirtouchConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         host = user_input[CONF_HOST]
         self._async_abort_entries_match({CONF_HOST: host})
 
-        at3 = AirTouch3(host)
-        at3.update_status()
+        client = AT3Client(host)
+        await client.update_status()
+        await client.close()
+        at3 = client.at3
         airtouch_has_groups = bool(
             at3.comms_status == AT3CommsStatus.OK and len(at3.groups) > 0
         )
@@ -43,9 +64,60 @@ class AirtouchConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 step_id="user", data_schema=DATA_SCHEMA, errors=errors
             )
 
+        # Each console is its own entry, identified by its system id
+        await self.async_set_unique_id(at3.id)
+        self._abort_if_unique_id_configured(updates={CONF_HOST: host})
+
         return self.async_create_entry(
-            title="AirTouch 3",
+            title=at3.name or "AirTouch 3",
             data={
                 CONF_HOST: user_input[CONF_HOST],
             },
         )
+
+
+class AirtouchOptionsFlow(config_entries.OptionsFlow):
+    """Handle Airtouch3 polling options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        seconds = vol.All(vol.Coerce(int), vol.Range(min=1, max=3600))
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_FAST_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL
+                        ),
+                    ): seconds,
+                    vol.Optional(
+                        CONF_FAST_WINDOW,
+                        default=options.get(CONF_FAST_WINDOW, DEFAULT_FAST_WINDOW),
+                    ): seconds,
+                    vol.Optional(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): seconds,
+                    vol.Optional(
+                        CONF_IDLE_AFTER,
+                        default=options.get(CONF_IDLE_AFTER, DEFAULT_IDLE_AFTER),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=86400)),
+                    vol.Optional(
+                        CONF_IDLE_SCAN_INTERVAL,
+                        default=options.get(
+                            CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL
+                        ),
+                    ): seconds,
+                }
+            ),
+        )
@@ -1,3 +1,42 @@
 """Constants for the Air Touch 3 integration."""
 
 DOMAIN = "airtouch3"
+
+# Console connection, the port is fixed by the console
+AT3_PORT = 8899
+CONNECT_TIMEOUT = 5
+REQUEST_TIMEOUT = 10
+
+# Setpoints and positions are stepped, all the steps to a target are sent in
+# one go, then topped up if the console missed any, for up to this many rounds
+STEP_ROUNDS = 3
+GROUP_POSITION_STEP = 5
+
+# Setpoint, fan and position changes are held until no more come for this
+# many seconds, then only the net change is sent
+DEBOUNCE_DELAY = 0.75
+
+# Polling options, in seconds. Polling is fast for a window after a command
+# or change, normal until nothing has changed for a while, then idle
+CONF_FAST_SCAN_INTERVAL = "fast_scan_interval"
+CONF_FAST_WINDOW = "fast_window"
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_IDLE_AFTER = "idle_after"
+CONF_IDLE_SCAN_INTERVAL = "idle_scan_interval"
+
+DEFAULT_FAST_SCAN_INTERVAL = 2
+DEFAULT_FAST_WINDOW = 30
+DEFAULT_SCAN_INTERVAL = 60
+DEFAULT_IDLE_AFTER = 900
+DEFAULT_IDLE_SCAN_INTERVAL = 300
+
+# Consoles are polled concurrently, sharing a scheduler that caps the requests
+# in flight and backs off from a console that stops answering, doubling from
+# the minimum to the maximum seconds
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+MAX_CONCURRENT_REQUESTS = 4
+BACKOFF_MIN = 5
+BACKOFF_MAX = 300
+
+# Seconds a command has to be confirmed by a status from the console
+COMMAND_TIMEOUT = 15
@@ -1,4 +1,3 @@
-import asyncio
 from homeassistant.components.cover import (
     ATTR_POSITION,
     CoverDeviceClass,
@@ -6,15 +5,13 @@ from homeassistant.components.cover import (
     CoverEntityFeature,
 )
 
-from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-    CoordinatorEntity,
-)
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 from airtouch3 import AirTouch3, AT3Group, AT3GroupMode
 
+from . import AT3DataUpdateCoordinator
 from .const import DOMAIN
+from .entity import AT3Entity
 
 import logging
 
@@ -36,49 +33,33 @@ async def async_setup_entry(hass, config_entry, async_add_devices):
         async_add_devices(new_devices)
 
 
-class AirTouchGroupEntityAsCover(CoordinatorEntity, CoverEntity):
+class AirTouchGroupEntityAsCover(AT3Entity, CoverEntity):
     def __init__(self, coordinator, group: AT3Group):
-        super().__init__(coordinator)
-        self._number = group.number
-        self._position_dec = group.position_dec
-        self._position_inc = group.position_inc
-        self._toggle = group.toggle
+        super().__init__(coordinator, ("groups", group.number))
 
-        at3_id = coordinator.data["id"]
+        at3_id = coordinator.data.id
         self._attr_unique_id = f"at3_{at3_id}_group_ascover_{self._number}"
         self._attr_device_class = CoverDeviceClass.DAMPER
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info for this device."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.coordinator.data["id"])},
-            name=self.coordinator.data["name"],
-            manufacturer="Polyaire",
-            model="Airtouch 3",
+    def _update_attrs(self) -> None:
+        group = self._data
+        self._attr_name = group.name
+        self._attr_current_cover_position = self._optimistic(
+            "open_percent", group.open_percent
         )
-
-    @property
-    def name(self):
-        """Return the name for this device."""
-        return self.coordinator.data["groups"][self._number]["name"]
-
-    @property
-    def is_closed(self):
-        """Return if valve is fully closed."""
-        return not self.coordinator.data["groups"][self._number]["is_on"]
-
-    @property
-    def supported_features(self) -> int:
-        """Flag supported features."""
-        mode = self.coordinator.data["groups"][self._number]["mode"]
-        if mode != AT3GroupMode.PERECENT:
-            return 0
-        return CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE | CoverEntityFeature.SET_POSITION
-    @property
-    def current_cover_position(self) -> int:
-        """Return current position of cover."""
-        return self.coordinator.data["groups"][self._number]["open_percent"]
+        if "open_percent" in self._pending:
+            self._attr_is_closed = self._pending["open_percent"] == 0
+        else:
+            self._attr_is_closed = not group.is_on
+
+        if group.mode != AT3GroupMode.PERECENT:
+            self._attr_supported_features = CoverEntityFeature(0)
+        else:
+            self._attr_supported_features = (
+                CoverEntityFeature.OPEN
+                | CoverEntityFeature.CLOSE
+                | CoverEntityFeature.SET_POSITION
+            )
 
     async def async_set_cover_position(self, **kwargs):
         """Set the current position of cover."""
@@ -87,50 +68,41 @@ class AirTouchGroupEntityAsCover(CoordinatorEntity, CoverEntity):
         if percentage == self.current_cover_position:
             return
 
-        position = self.coordinator.data["groups"][self._number]["open_percent"]
         # Turn off when zero position given
         if percentage == 0:
             await self.async_close_cover()
-        # Turn on if position given and currently off
-        if percentage != 0 and position == 0:
-            await self.async_open_cover()
-
-        # Max 20 adjustements of percentage in one go should get from
-        # 0% to 100% or 100% to 0%
-        count = 0
-        while count < 20:
-            if percentage == position:
-                break
-            elif percentage > position:
-                position = self._position_inc()
-            elif percentage < position:
-                position = self._position_dec()
-
-            if position:
-                self.coordinator.data["groups"][self._number]["open_percent"] = position
-            else:
-                break
-
-            await asyncio.sleep(0.05)
-            count = count + 1
-
-        await self.coordinator.async_refresh()
+            return
+
+        self._async_set_pending("open_percent", percentage)
+
+    async def _async_apply_pending(self, pending):
+        """Send the net position change"""
+        percentage = pending.get("open_percent")
+        if percentage is None:
+            return
+
+        # Turn on if currently off
+        if not self.coordinator.data.groups[self._number].is_on:
+            await self._command(AT3DataUpdateCoordinator.CMD_GRP_TOGGLE)
+
+        await self.coordinator.async_set_group_position(self._number, percentage)
 
     async def async_open_cover(self, **kwargs):
         """Fully open zone vent."""
+        self._cancel_pending()
         if self.is_closed:
-            is_on = self._toggle()
-            if is_on != None:
-                self.coordinator.data["groups"][self._number]["is_on"] = is_on
-                args = {ATTR_POSITION: 100}
-                await self.async_set_cover_position(**args)
-        await self.coordinator.async_refresh()
+            await self._async_send_now({"open_percent": 100})
 
     async def async_close_cover(self, **kwargs):
         """Fully close zone vent."""
-        if not self.is_closed:
-            is_on = self._toggle()
-            if is_on != None:
-                self.coordinator.data["groups"][self._number]["is_on"] = is_on
-                self.coordinator.data["groups"][self._number]["open_percent"] = 0
-        await self.coordinator.async_refresh()
+        self._cancel_pending()
+        # After any position being sent, or that would open it again
+        async with self._send_lock:
+            if not self.is_closed:
+                await self._command(AT3DataUpdateCoordinator.CMD_GRP_TOGGLE)
+
+    async def _command(self, cmd: str) -> bool:
+        """Issue a command for this group, the data is updated from the reply"""
+        return await self.coordinator.async_issue_command(
+            cmd, **{AT3DataUpdateCoordinator.IDX: self._number}
+        )
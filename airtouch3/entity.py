@@ -0,0 +1,127 @@
+"""Base entity for the Air Touch 3 integration."""
+from __future__ import annotations
+
+import asyncio
+from abc import abstractmethod
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DEBOUNCE_DELAY, DOMAIN
+
+
+class AT3Entity(CoordinatorEntity):
+    """An entity of one AC unit or group, its coordinator context is the
+    snapshot key of that unit or group, ie ("groups", 2).
+
+    The device info and unique id are set once, the rest of the state is
+    copied into the _attr_ attributes by _update_attrs only when the unit or
+    group changes, so writing the state does no lookups.
+
+    Rapid changes from the UI are coalesced, each is shown straight away as
+    pending and only the net change is sent once DEBOUNCE_DELAY passes with
+    no more changes. Sends are one at a time, so a change made while one is
+    stepping is sent once it is done, from the state it left.
+    """
+
+    def __init__(self, coordinator, context: tuple) -> None:
+        super().__init__(coordinator, context)
+        self._kind, self._number = context
+        self._last_available: bool = None
+        self._pending: dict[str, Any] = {}
+        self._pending_cancel: CALLBACK_TYPE = None
+        self._send_lock = asyncio.Lock()
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, coordinator.data.id)},
+            name=coordinator.data.name,
+            manufacturer="Polyaire",
+            model="Airtouch 3",
+        )
+        self._update_attrs()
+
+    @property
+    def _data(self):
+        """State of this entity's AC unit or group in the snapshot, None once
+        the console no longer reports it"""
+        return getattr(self.coordinator.data, self._kind).get(self._number)
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._cancel_pending()
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write the state when this unit or group, or the availability
+        of the console, changed"""
+        available = self.coordinator.last_update_success
+        if (
+            available == self._last_available
+            and self.coordinator_context not in self.coordinator.changed
+        ):
+            return
+        self._last_available = available
+        self._async_write_state()
+
+    @callback
+    def _async_write_state(self) -> None:
+        """Refresh the attributes from the snapshot and write the state"""
+        if self._data is not None:
+            self._update_attrs()
+        self.async_write_ha_state()
+
+    @abstractmethod
+    def _update_attrs(self) -> None:
+        """Copy the state of the unit or group, and any pending changes, into
+        the _attr_ attributes"""
+
+    def _optimistic(self, field: str, value: Any) -> Any:
+        """The pending value of the field, if there is one, else value"""
+        return self._pending.get(field, value)
+
+    @callback
+    def _async_set_pending(self, field: str, value: Any) -> None:
+        """Show the value as the field's state, sending it once changes settle"""
+        self._pending[field] = value
+        self._async_write_state()
+
+        if self._pending_cancel is not None:
+            self._pending_cancel()
+        self._pending_cancel = async_call_later(
+            self.hass, DEBOUNCE_DELAY, self._async_send_pending
+        )
+
+    @callback
+    def _cancel_pending(self) -> None:
+        """Drop any pending changes, ie when overridden by an immediate command"""
+        if self._pending_cancel is not None:
+            self._pending_cancel()
+            self._pending_cancel = None
+        self._pending.clear()
+
+    async def _async_send_pending(self, _now=None) -> None:
+        self._pending_cancel = None
+        async with self._send_lock:
+            pending = dict(self._pending)
+            if not pending:
+                return
+            try:
+                await self._async_apply_pending(pending)
+            finally:
+                # Keep changes made while sending, they are sent next
+                for field, value in pending.items():
+                    if self._pending.get(field) == value:
+                        del self._pending[field]
+                self._async_write_state()
+
+    async def _async_send_now(self, changes: dict[str, Any]) -> None:
+        """Send the changes straight away, once any send under way is done"""
+        async with self._send_lock:
+            await self._async_apply_pending(changes)
+
+    @abstractmethod
+    async def _async_apply_pending(self, pending: dict[str, Any]) -> None:
+        """Send the pending changes to the console"""
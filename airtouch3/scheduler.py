@@ -0,0 +1,40 @@
+"""Request scheduler shared by all the AirTouch 3 consoles."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+from .const import BACKOFF_MAX, BACKOFF_MIN, MAX_CONCURRENT_REQUESTS
+
+
+class AT3Scheduler:
+    """Schedules the requests of every console on the one event loop.
+
+    Each console has its own connection and lock, so consoles are polled
+    concurrently and a poll of all of them takes about as long as the slowest.
+    The scheduler caps the requests in flight across the consoles, and backs
+    off from a console after a failed request so one that is offline fails
+    fast instead of holding a slot until it times out.
+    """
+
+    def __init__(self, max_requests: int = MAX_CONCURRENT_REQUESTS) -> None:
+        self.slots = asyncio.Semaphore(max_requests)
+        # Host and port to consecutive failures and when it may next be tried
+        self._failures: dict[tuple[str, int], tuple[int, float]] = {}
+
+    def backoff(self, host: str, port: int) -> float:
+        """Seconds until the console may be tried again, 0 if it may now"""
+        console = (host, port)
+        if console not in self._failures:
+            return 0
+        return max(0, self._failures[console][1] - time.monotonic())
+
+    def record(self, host: str, port: int, success: bool) -> None:
+        """Record the result of a request, backing off further on failure"""
+        console = (host, port)
+        if success:
+            self._failures.pop(console, None)
+            return
+        failures = self._failures.get(console, (0, 0))[0] + 1
+        delay = min(BACKOFF_MAX, BACKOFF_MIN * 2 ** (failures - 1))
+        self._failures[console] = (failures, time.monotonic() + delay)
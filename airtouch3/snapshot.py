@@ -0,0 +1,96 @@
+"""Compact snapshot of the AirTouch 3 console state."""
+from __future__ import annotations
+
+from airtouch3 import AirTouch3
+
+# Key of the changes to the system name or id
+SYSTEM = ("system", None)
+
+
+class AT3State:
+    """State of one AC unit, group or sensor, as a fixed set of slots"""
+
+    __slots__ = ()
+
+    def update(self, source) -> bool:
+        """Copy the fields from the library object, returning if any changed"""
+        changed = False
+        for field in self.__slots__:
+            value = getattr(source, field)
+            if getattr(self, field, None) != value:
+                setattr(self, field, value)
+                changed = True
+        return changed
+
+
+class AT3AcUnitState(AT3State):
+    __slots__ = (
+        "name",
+        "number",
+        "brand",
+        "fan_speed",
+        "has_error",
+        "is_on",
+        "mode",
+        "temperature",
+        "temperature_sp",
+    )
+
+
+class AT3GroupState(AT3State):
+    __slots__ = (
+        "name",
+        "number",
+        "is_on",
+        "mode",
+        "open_percent",
+        "temperature",
+        "temperature_sp",
+    )
+
+
+class AT3SensorState(AT3State):
+    __slots__ = ("name", "temperature", "available", "low_battery")
+
+
+class AT3Snapshot:
+    """State of the whole console, updated in place from each status response.
+
+    Each update returns the keys of what changed, ie ("groups", 2), which the
+    entities use as their coordinator context to only write their state when
+    their own AC unit or group changed.
+    """
+
+    __slots__ = ("name", "id", "ac_units", "groups", "sensors")
+
+    def __init__(self) -> None:
+        self.name = ""
+        self.id = ""
+        self.ac_units: dict[int, AT3AcUnitState] = {}
+        self.groups: dict[int, AT3GroupState] = {}
+        self.sensors: dict[str, AT3SensorState] = {}
+
+    def update(self, at3: AirTouch3) -> set[tuple]:
+        """Update from the library object, returning the keys that changed"""
+        changed = set()
+        if self.name != at3.name or self.id != at3.id:
+            self.name = at3.name
+            self.id = at3.id
+            changed.add(SYSTEM)
+
+        for kind, states, state_class, sources in (
+            ("ac_units", self.ac_units, AT3AcUnitState, at3.ac_units),
+            ("groups", self.groups, AT3GroupState, at3.groups),
+            ("sensors", self.sensors, AT3SensorState, at3.sensors),
+        ):
+            for key, source in sources.items():
+                state = states.get(key)
+                if state is None:
+                    state = states[key] = state_class()
+                if state.update(source):
+                    changed.add((kind, key))
+            for key in states.keys() - sources.keys():
+                del states[key]
+                changed.add((kind, key))
+
+        return changed
@@ -7,11 +7,13 @@ from numpy import empty
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE, Platform
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.core import HomeAssistant
 
 from .const import DOMAIN, SCAN_INTERVAL
-from .aus_fuel_api import AusFuelAPI
+from .aggregate import AusFuelAggregates
+from .cache import async_get_fuel_cache
+from .index import AusFuelRanking
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,13 +27,34 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     latitude = entry.data[CONF_LATITUDE]
     longitude = entry.data[CONF_LONGITUDE]
 
+    # Prices come from the cache shared with the other entries, only the
+    # selected stations are kept, and the cache only keeps the prices of the
+    # fuel types of an entry
+    cache = async_get_fuel_cache(hass)
+    entry.async_on_unload(cache.async_track(entry.data["fuel_types"]))
+    selected = set(entry.data["stations"])
+    ranking = AusFuelRanking(
+        cache, latitude, longitude, search_distance, entry.data["fuel_types"]
+    )
+    aggregates = AusFuelAggregates(cache, selected, entry.data["fuel_types"])
+
     async def async_update_data():
-        api = AusFuelAPI(search_distance, latitude, longitude)
-        result = await hass.async_add_executor_job(api.refresh_data)
-        if result:
-            return api.get_data()
-        else:
-            return None
+        stations = await cache.async_get_stations(
+            search_distance, latitude, longitude, entry.data["fuel_types"]
+        )
+        if stations is None:
+            raise UpdateFailed("Could not fetch fuel prices")
+        ranking.update()
+        aggregates.update()
+        return {
+            "stations": {
+                record_id: record
+                for record_id, record in stations.items()
+                if record_id in selected
+            },
+            "ranking": ranking,
+            "aggregates": aggregates,
+        }
 
     coordinator = DataUpdateCoordinator(
         hass,
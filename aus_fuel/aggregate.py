@@ -0,0 +1,84 @@
+"""Price aggregates of the Australia Fuel Prices stations."""
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+
+
+class FuelPriceAggregate:
+    """Prices of one fuel type at a set of stations, kept sorted so the
+    lowest, highest and median are read without a scan, and a changed price
+    is moved in place."""
+
+    def __init__(self) -> None:
+        self._prices: dict[str, float] = {}
+        self._sorted: list[tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def set(self, record_id: str, price: float | None) -> None:
+        """Set the price at the station, None if it no longer sells it"""
+        old = self._prices.get(record_id)
+        if old == price:
+            return
+        if old is not None:
+            del self._sorted[bisect_left(self._sorted, (old, record_id))]
+        if price is None:
+            del self._prices[record_id]
+        else:
+            self._prices[record_id] = price
+            insort(self._sorted, (price, record_id))
+
+    @property
+    def min(self) -> float | None:
+        return self._sorted[0][0] if self._sorted else None
+
+    @property
+    def max(self) -> float | None:
+        return self._sorted[-1][0] if self._sorted else None
+
+    @property
+    def median(self) -> float | None:
+        if not self._sorted:
+            return None
+        mid = len(self._sorted) // 2
+        if len(self._sorted) % 2:
+            return self._sorted[mid][0]
+        return (self._sorted[mid - 1][0] + self._sorted[mid][0]) / 2
+
+    @property
+    def cheapest(self) -> str | None:
+        """Id of the station with the lowest price"""
+        return self._sorted[0][1] if self._sorted else None
+
+
+class AusFuelAggregates:
+    """Aggregate of each fuel type across the stations of an entry.
+
+    Each refresh applies only the prices the cache changed since the last,
+    so the aggregates are not rebuilt from every station. If the changes
+    have been forgotten by the cache, every station is applied again.
+    """
+
+    def __init__(self, cache, station_ids, fuel_types) -> None:
+        self._cache = cache
+        self._station_ids = set(station_ids)
+        self._version: int = None
+        self.fuel_types = {fuel_type: FuelPriceAggregate() for fuel_type in fuel_types}
+
+    def update(self) -> None:
+        """Apply the prices changed in the cache since the last update"""
+        changed = None
+        if self._version is not None:
+            changed = self._cache.changed_since(self._version)
+        if changed is None:
+            changed = self._station_ids
+        else:
+            changed &= self._station_ids
+        self._version = self._cache.version
+
+        for record_id in changed:
+            record = self._cache.stations.get(record_id)
+            prices = record.prices if record is not None else {}
+            for fuel_type, aggregate in self.fuel_types.items():
+                aggregate.set(record_id, prices.get(fuel_type))
@@ -1,93 +1,202 @@
-from xmlrpc.client import boolean
-import requests
-import json
+import asyncio
+import logging
+import math
+import sys
 
-from .const import QUERY_URL
+import aiohttp
 
+from .const import QUERY_URL, READ_CHUNK_SIZE, REQUEST_TIMEOUT
+from .parser import FuelDataParser
 
-class AusFuelPrice:
-    name: str
-    address: str
-    latitude: float
-    longitude: float
-    brand: str
-    price: float
-    fuel_type: str
-    station_id: str
+_LOGGER = logging.getLogger(__name__)
+
+# aiohttp decodes brotli when a brotli package is installed, only ask for it then
+try:
+    import brotli  # noqa: F401
+
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+
+        ACCEPT_ENCODING = "gzip, deflate, br"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip, deflate"
+
+
+# Fuel types to their ids, as used in the sensor ids, shared by all stations
+_FUEL_TYPE_IDS: dict[str, str] = {}
+
+
+def fuel_type_id(fuel_type: str) -> str:
+    """Id of the fuel type, ie Premium_Diesel, computed once per type"""
+    if (fuel_id := _FUEL_TYPE_IDS.get(fuel_type)) is None:
+        fuel_id = sys.intern(fuel_type.replace(" ", "_"))
+        _FUEL_TYPE_IDS[sys.intern(fuel_type)] = fuel_id
+    return fuel_id
+
+
+def station_id(name: str) -> str:
+    """Id of the station with the name, as used in the sensor ids"""
+    return name.replace(" ", "_")
+
+
+class AusFuelStation:
+    """A station and its prices, in cents per litre keyed by fuel type. The
+    fuel types are interned so every station shares the one string of each.
+
+    Each station has one record, updated in place on each refresh, so sensors
+    can hold on to the record of their station.
+    """
+
+    __slots__ = ("id", "name", "address", "latitude", "longitude", "brand", "prices")
+
+    def __init__(self, station: dict) -> None:
+        self.id = station_id(station["name"])
+        self.prices: dict[str, float] = {}
+        self.update(station)
+
+    def update(self, station: dict) -> bool:
+        """Update from the station entry of a response, True if the prices
+        changed"""
+        self.name = station["name"]
+        self.address = station["address"]
+        self.latitude = station["location"]["latitude"]
+        self.longitude = station["location"]["longitude"]
+        self.brand = station["brand"]
+        prices = {
+            sys.intern(price_entry["type"]): float(price_entry["price"])
+            for price_entry in station["prices"]
+        }
+        if prices == self.prices:
+            return False
+        self.prices = prices
+        return True
+
+    def price_id(self, fuel_type: str) -> str:
+        """Id of the price of the fuel type at this station"""
+        return f"{self.id}_{fuel_type_id(fuel_type)}"
 
     def __str__(self):
-        return f"{self.name} {self.address} {self.brand} {self.fuel_type} @ {self.price}c/L"
+        prices = ", ".join(f"{fuel} @ {price}c/L" for fuel, price in self.prices.items())
+        return f"{self.name} {self.address} {self.brand} {prices}"
 
 
 class AusFuelAPI:
-    def __init__(self, search_distance, latitude, longitude):
-        self._search_meters = search_distance * 1000
+    """Fuel prices around a location, fetched on a shared aiohttp session.
+
+    Keep one instance per location so the connection is reused and the
+    ETag and Last-Modified of the last response are sent back, letting the
+    server answer 304 Not Modified when the prices have not changed.
+
+    The response is parsed as it arrives, each station entry cut down to the
+    fields of its record and the prices of the fuel types given, or all of
+    them when not given, as soon as it is complete.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        search_distance,
+        latitude,
+        longitude,
+        fuel_types: frozenset[str] = None,
+    ):
+        self._session = session
+        self._search_meters = math.ceil(search_distance * 1000)
         self._latitude = latitude
         self._longitude = longitude
+        self.fuel_types = fuel_types
+        self._etag: str = None
+        self._last_modified: str = None
+        # Station entries of the last good response, None if not modified
+        self.entries: list[dict] | None = None
 
-    def refresh_data(self) -> boolean:
+    async def refresh_data(self) -> bool:
+        """Fetch the prices, keeping the previous ones if not modified"""
         query = QUERY_URL.format(
             lat=self._latitude, long=self._longitude, dist=self._search_meters
         )
-        raw_html = requests.get(query).text
-        json_data = json.loads(raw_html)
-        self._fuel_prices = json_data["data"]
-        return json_data["message"] == "ok"
-
-    def get_stations_fuel_types(self) -> list:
-        stations = []
-        fuel_types = []
-        for entry in self._fuel_prices:
-            # Look for a station entry
-            if not "station" in entry:
-                continue
-
-            station = entry["station"]
-            stations.append(
-                {
-                    "id": station["name"].replace(" ", "_"),
-                    "name": station["name"],
-                    "address": station["address"],
-                    "latitude": station["location"]["latitude"],
-                    "longitude": station["location"]["longitude"],
-                    "brand": station["brand"],
-                }
-            )
-            for price_entry in station["prices"]:
-                if not price_entry["type"] in fuel_types:
-                    fuel_types.append(price_entry["type"])
-
-        return {"stations": stations, "fuel_types": fuel_types}
-
-    def get_data(self) -> dict:
-        prices = {}
-        for entry in self._fuel_prices:
-            # Look for a station entry
-            if not "station" in entry:
-                continue
-
-            station = entry["station"]
-            name = station["name"]
-            address = station["address"]
-            latitude = station["location"]["latitude"]
-            longitude = station["location"]["longitude"]
-            brand = station["brand"]
-            for price_entry in station["prices"]:
-                price = AusFuelPrice()
-                price.name = name
-                price.address = address
-                price.latitude = latitude
-                price.longitude = longitude
-                price.brand = brand
-                price.price = float(price_entry["price"])
-                price.fuel_type = price_entry["type"]
-                price.station_id = name.replace(" ", "_")
-
-                n = price.name.replace(" ", "_")
-                f = price.fuel_type.replace(" ", "_")
-                price_id = f"{n}_{f}"
-                prices[price_id] = price
-
-        data = {"prices": prices}
-
-        return data
+        headers = {"Accept-Encoding": ACCEPT_ENCODING}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+
+        try:
+            async with self._session.get(
+                query,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            ) as response:
+                if response.status == 304:
+                    _LOGGER.debug("Fuel prices not modified")
+                    self.entries = None
+                    return True
+                response.raise_for_status()
+                parser = FuelDataParser(self._keep)
+                async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                    parser.feed(chunk)
+                parser.close()
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("Fuel price request failed: %r", err)
+            return False
+        except ValueError as err:
+            _LOGGER.debug("Fuel price response is not valid JSON: %s", err)
+            return False
+
+        if parser.values.get("message") != "ok":
+            return False
+        self.entries = parser.data
+        # Only validators of a good response are sent back
+        self._etag = etag
+        self._last_modified = last_modified
+        return True
+
+    def _keep(self, entry: dict) -> dict | None:
+        """The station of the entry, with only what its record holds"""
+        station = entry.get("station")
+        if station is None:
+            return None
+        prices = station["prices"]
+        if self.fuel_types is not None:
+            prices = [
+                price_entry
+                for price_entry in prices
+                if price_entry["type"] in self.fuel_types
+            ]
+        location = station["location"]
+        return {
+            "name": station["name"],
+            "address": station["address"],
+            "brand": station["brand"],
+            "location": {
+                "latitude": location["latitude"],
+                "longitude": location["longitude"],
+            },
+            "prices": prices,
+        }
+
+
+def get_stations_fuel_types(stations) -> dict:
+    """The stations, and all the fuel types they sell, for selection"""
+    station_list = []
+    fuel_types = []
+    for station in stations:
+        station_list.append(
+            {
+                "id": station.id,
+                "name": station.name,
+                "address": station.address,
+                "latitude": station.latitude,
+                "longitude": station.longitude,
+                "brand": station.brand,
+            }
+        )
+        for fuel_type in station.prices:
+            if fuel_type not in fuel_types:
+                fuel_types.append(fuel_type)
+
+    return {"stations": station_list, "fuel_types": fuel_types}
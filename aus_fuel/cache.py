@@ -0,0 +1,328 @@
+"""Fuel price cache shared by all the Australia Fuel Prices entries."""
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from collections.abc import Callable, Iterable
+import logging
+import time
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from . import geohash
+from .aus_fuel_api import AusFuelAPI, AusFuelStation, station_id
+from .index import StationIndex
+from .const import (
+    CACHE_EXPIRY,
+    CACHE_TTL,
+    CHANGE_LOG_SIZE,
+    DATA_CACHE,
+    MAX_TILE_FETCHES,
+    MAX_TILES,
+    TILE_PRECISION_MIN,
+    TILE_PRECISIONS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def tile_precision(search_distance) -> int:
+    """Geohash precision of the tiles for a search of the distance in km"""
+    for max_distance, precision in TILE_PRECISIONS:
+        if search_distance <= max_distance:
+            return precision
+    return TILE_PRECISION_MIN
+
+
+def _covers(held: frozenset[str] | None, wanted: frozenset[str] | None) -> bool:
+    """If prices of the fuel types held, None for all, include those wanted"""
+    return held is None or (wanted is not None and wanted <= held)
+
+
+class _Tile:
+    """A geohash tile that was fetched, and the stations in it"""
+
+    __slots__ = ("geohash", "api", "group", "station_ids", "fetched", "used")
+
+    def __init__(self, tile: str, api: AusFuelAPI) -> None:
+        self.geohash = tile
+        # Holds the prices of the fuel types of its API, the request of the
+        # tiles of the group fetched with it
+        self.api = api
+        self.group: tuple[str, ...] = (tile,)
+        self.station_ids: set[str] = set()
+        self.fetched: float = None
+        self.used = time.monotonic()
+
+
+class AusFuelCache:
+    """Prices of every station fetched by any entry, one record per station.
+
+    A search circle is split into fixed geohash tiles about the size of its
+    radius, cached for CACHE_TTL, then the stations of its tiles within the
+    distance are assembled locally. The tiles of a search not cached are
+    fetched together in one request, the circle around them, so a search
+    is one request of a few times its area. So searches
+    that overlap, or move a little, reuse most of their tiles, and a tile
+    being fetched is waited for rather than fetched again. A fresh coarser tile
+    holding a tile serves it too. Tiles not asked for in CACHE_EXPIRY, or
+    beyond the MAX_TILES most recently asked for, are dropped along with
+    their stations not in any other tile.
+
+    Only the prices of the fuel types tracked by an entry are kept, dropped
+    from each station as the response is parsed, along with the fields the
+    records do not hold. A tile fetched without a fuel type later asked for,
+    ie by a new entry, is fetched again. The config flow asks for all of them.
+
+    The stations are kept in a spatial index to find those near a location,
+    and version changes whenever a fetch changes the prices of any station.
+    The stations changed by the last CHANGE_LOG_SIZE versions are kept, so
+    those following the prices can apply only what changed.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        self._session = session
+        self.stations: dict[str, AusFuelStation] = {}
+        self.index = StationIndex()
+        self.version = 0
+        self._changes: deque[tuple[int, set[str]]] = deque(maxlen=CHANGE_LOG_SIZE)
+        self._tiles: dict[str, _Tile] = {}
+        # Tile to its fetch under way, and the fuel types it keeps
+        self._fetching: dict[str, tuple[asyncio.Task, frozenset[str] | None]] = {}
+        self._slots = asyncio.Semaphore(MAX_TILE_FETCHES)
+        # Fuel types of the entries, to the number tracking each
+        self._tracked: Counter[str] = Counter()
+
+    @callback
+    def async_track(self, fuel_types: Iterable[str]) -> Callable[[], None]:
+        """Keep the prices of the fuel types, until the returned callback"""
+        fuel_types = list(fuel_types)
+        self._tracked.update(fuel_types)
+
+        @callback
+        def untrack() -> None:
+            self._tracked.subtract(fuel_types)
+            self._tracked += Counter()
+
+        return untrack
+
+    async def async_get_stations(
+        self, search_distance, latitude, longitude, fuel_types=None
+    ) -> dict[str, AusFuelStation] | None:
+        """Stations within the distance in km of the location, nearest first,
+        with the prices of at least the fuel types, or all of them if None.
+        None if they could not be fetched"""
+        now = time.monotonic()
+        wanted = None if fuel_types is None else frozenset(fuel_types)
+        tiles: list[_Tile] = []
+        # A dict as several tiles can be in one fetch
+        fetches: dict[asyncio.Task, None] = {}
+        missing: list[str] = []
+        precision = tile_precision(search_distance)
+        for tile in geohash.covering(latitude, longitude, search_distance, precision):
+            if (cached := self._fresh_tile(tile, now, wanted)) is not None:
+                cached.used = now
+                tiles.append(cached)
+            elif (fetch := self._tile_fetch(tile, wanted)) is not None:
+                fetches[fetch] = None
+            else:
+                missing.append(tile)
+
+        if missing:
+            # All fetched in one request, after any fetch of them keeping fewer
+            # fuel types
+            keep = None if wanted is None else wanted | frozenset(self._tracked)
+            previous = {
+                self._fetching[tile][0] for tile in missing if tile in self._fetching
+            }
+            fetch = asyncio.get_running_loop().create_task(
+                self._async_fetch(tuple(missing), keep, previous)
+            )
+            for tile in missing:
+                self._fetching[tile] = (fetch, keep)
+            fetches[fetch] = None
+
+        # Shielded, a fetch others are waiting for runs on if this is cancelled
+        for fetched in await asyncio.gather(*map(asyncio.shield, fetches)):
+            if fetched is None:
+                return None
+            tiles.extend(fetched)
+
+        # A stale coarser tile may still hold a station these no longer do
+        held = set().union(*(tile.station_ids for tile in tiles))
+        record_ids, _ = self.index.within(latitude, longitude, search_distance)
+        return {
+            record_id: self.stations[record_id]
+            for record_id in record_ids
+            if record_id in held
+        }
+
+    def _fresh_tile(
+        self, tile: str, now: float, wanted: frozenset[str] | None
+    ) -> _Tile | None:
+        """The tile, or a coarser one holding it, if fetched within the TTL
+        with the fuel types wanted"""
+        for end in range(len(tile), 0, -1):
+            cached = self._tiles.get(tile[:end])
+            if (
+                cached is not None
+                and cached.fetched is not None
+                and now - cached.fetched < CACHE_TTL.total_seconds()
+                and _covers(cached.api.fuel_types, wanted)
+            ):
+                return cached
+        return None
+
+    def _tile_fetch(
+        self, tile: str, wanted: frozenset[str] | None
+    ) -> asyncio.Task | None:
+        """The fetch of the tile, or a coarser one holding it, if under way
+        with the fuel types wanted"""
+        for end in range(len(tile), 0, -1):
+            fetch, keep = self._fetching.get(tile[:end], (None, None))
+            if fetch is not None and _covers(keep, wanted):
+                return fetch
+        return None
+
+    async def _async_fetch(
+        self,
+        group: tuple[str, ...],
+        fuel_types: frozenset[str] | None,
+        previous: set[asyncio.Task],
+    ) -> list[_Tile] | None:
+        """Fetch the tiles in one request, reusing the API of the last request
+        for just these tiles, with the same fuel types, to send the validators
+        back"""
+        try:
+            if previous:
+                await asyncio.wait(previous)
+            cached = [self._tiles.get(tile) for tile in group]
+            if all(
+                tile is not None
+                and tile.group == group
+                and tile.api.fuel_types == fuel_types
+                for tile in cached
+            ):
+                api = cached[0].api
+            else:
+                latitude, longitude, radius = geohash.circle(*group)
+                api = AusFuelAPI(self._session, radius, latitude, longitude, fuel_types)
+            now = time.monotonic()
+            for num, tile in enumerate(group):
+                if cached[num] is None:
+                    cached[num] = self._tiles[tile] = _Tile(tile, api)
+                cached[num].used = now
+
+            async with self._slots:
+                success = await api.refresh_data()
+            if not success:
+                for tile in cached:
+                    if tile.fetched is None:
+                        del self._tiles[tile.geohash]
+                return None
+            for tile in cached:
+                tile.api = api
+                tile.group = group
+            # Not modified, the stations are as they were
+            entries, api.entries = api.entries, None
+            if entries is None:
+                now = time.monotonic()
+                for tile in cached:
+                    tile.fetched = now
+                return cached
+
+            # The circle reaches past the tiles, keep only the stations in them
+            precision = len(group[0])
+            station_ids: dict[str, set[str]] = {tile: set() for tile in group}
+            changed = set()
+            for station in entries:
+                location = station["location"]
+                tile = geohash.encode(
+                    location["latitude"], location["longitude"], precision
+                )
+                if tile not in station_ids:
+                    continue
+                record = self.stations.get(station_id(station["name"]))
+                if record is None:
+                    record = AusFuelStation(station)
+                    self.stations[record.id] = record
+                    changed.add(record.id)
+                elif record.update(station):
+                    changed.add(record.id)
+                self.index.add(record.id, record.latitude, record.longitude)
+                station_ids[tile].add(record.id)
+
+            removed = set()
+            now = time.monotonic()
+            for tile in cached:
+                removed |= tile.station_ids - station_ids[tile.geohash]
+                tile.station_ids = station_ids[tile.geohash]
+                tile.fetched = now
+            self._changed(changed)
+            self._drop_stations(removed)
+            self._evict()
+            return cached
+        finally:
+            for tile in group:
+                if self._fetching.get(tile, (None,))[0] is asyncio.current_task():
+                    del self._fetching[tile]
+
+    def _evict(self) -> None:
+        """Drop the tiles not asked for in the expiry, then the least recently
+        asked for beyond the maximum"""
+        now = time.monotonic()
+        tiles = sorted(self._tiles.items(), key=lambda item: item[1].used)
+        for num, (tile, cached) in enumerate(tiles):
+            if tile in self._fetching:
+                continue
+            if (
+                now - cached.used > CACHE_EXPIRY.total_seconds()
+                or len(tiles) - num > MAX_TILES
+            ):
+                del self._tiles[tile]
+                self._drop_stations(cached.station_ids)
+
+    def _drop_stations(self, station_ids: set[str]) -> None:
+        """Drop the stations no tile holds, they no longer have prices"""
+        held = set()
+        for cached in self._tiles.values():
+            held |= cached.station_ids
+        dropped = set()
+        for record_id in station_ids - held:
+            record = self.stations.pop(record_id, None)
+            if record is not None:
+                record.prices = {}
+                self.index.remove(record_id)
+                dropped.add(record_id)
+        self._changed(dropped)
+
+    def _changed(self, station_ids: set[str]) -> None:
+        """Record the stations whose prices changed as a new version"""
+        if not station_ids:
+            return
+        self.version += 1
+        self._changes.append((self.version, station_ids))
+
+    def changed_since(self, version: int) -> set[str] | None:
+        """Stations whose prices changed after the version, None if that is
+        too long ago to tell"""
+        if version == self.version:
+            return set()
+        if not self._changes or self._changes[0][0] > version + 1:
+            return None
+        changed = set()
+        for change_version, station_ids in self._changes:
+            if change_version > version:
+                changed |= station_ids
+        return changed
+
+
+@callback
+def async_get_fuel_cache(hass: HomeAssistant) -> AusFuelCache:
+    """The cache shared by all the entries and the config flow"""
+    if DATA_CACHE not in hass.data:
+        hass.data[DATA_CACHE] = AusFuelCache(async_get_clientsession(hass))
+    return hass.data[DATA_CACHE]
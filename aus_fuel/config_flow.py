@@ -15,7 +15,8 @@ import homeassistant.helpers.config_validation as cv
 from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE
 
 from .const import DOMAIN
-from .aus_fuel_api import AusFuelAPI
+from .aus_fuel_api import get_stations_fuel_types
+from .cache import async_get_fuel_cache
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,13 +36,15 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict:
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
     # Validate the data can be used to set up a connection.
-    api = AusFuelAPI(data["search_distance"], data[CONF_LATITUDE], data[CONF_LONGITUDE])
-    result = await hass.async_add_executor_job(api.refresh_data)
-    if not result:
+    # Fetched into the cache, where the new entry finds it
+    stations = await async_get_fuel_cache(hass).async_get_stations(
+        data["search_distance"], data[CONF_LATITUDE], data[CONF_LONGITUDE]
+    )
+    if stations is None:
         raise CannotConnect
 
     # All good if got to here
-    return api.get_stations_fuel_types()
+    return get_stations_fuel_types(stations.values())
 
 
 class AusFuelConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
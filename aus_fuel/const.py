@@ -4,5 +4,27 @@ from datetime import timedelta
 DOMAIN = "aus_fuel"
 
 SCAN_INTERVAL = timedelta(hours=1)
+REQUEST_TIMEOUT = 30
+READ_CHUNK_SIZE = 65536
 
 QUERY_URL = "https://trafficbuddy.com.au/?lat={lat}&lon={long}&distance={dist}"
+
+# Prices fetched for a tile are shared by all the entries for this long, a
+# tile not asked for in the expiry is dropped, keeping at most MAX_TILES
+DATA_CACHE = f"{DOMAIN}_cache"
+CACHE_TTL = timedelta(minutes=15)
+CACHE_EXPIRY = timedelta(hours=3)
+MAX_TILES = 256
+MAX_TILE_FETCHES = 4
+
+# Price changes remembered for the aggregates, beyond this they are rebuilt
+CHANGE_LOG_SIZE = 256
+
+# Geohash precision of the tiles for searches up to each distance in km, so
+# a tile is about the size of the search radius, ie about 5km square up to
+# 10km, 20 by 39km up to 50km, and 156km square beyond
+TILE_PRECISIONS = ((10, 5), (50, 4))
+TILE_PRECISION_MIN = 3
+
+# Cells of the spatial index of the stations, about 11km square
+GRID_CELL_DEGREES = 0.1
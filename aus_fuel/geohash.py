@@ -0,0 +1,117 @@
+"""Geohash tiles of the Australia Fuel Prices integration."""
+from __future__ import annotations
+
+from math import asin, cos, degrees, floor, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371.0
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great circle distance between two points"""
+    lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+    a = (
+        sin((lat2 - lat1) / 2) ** 2
+        + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+
+
+def _cell_size(precision: int) -> tuple[float, float]:
+    """Height and width in degrees of the tiles of the precision, each
+    character is five bits, alternating from longitude"""
+    bits = precision * 5
+    return 180 / 2 ** (bits // 2), 360 / 2 ** (bits - bits // 2)
+
+
+def encode(latitude: float, longitude: float, precision: int) -> str:
+    """Geohash of the tile of the precision holding the point"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bit = 0
+    char = 0
+    even = True
+    while len(geohash) < precision:
+        value, value_range = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        char <<= 1
+        if value >= mid:
+            char |= 1
+            value_range[0] = mid
+        else:
+            value_range[1] = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            geohash.append(_BASE32[char])
+            bit = 0
+            char = 0
+    return "".join(geohash)
+
+
+def bounds(geohash: str) -> tuple[float, float, float, float]:
+    """South, north, west and east edges of the tile"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = _BASE32.index(char)
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even else lat_range
+            mid = (value_range[0] + value_range[1]) / 2
+            if bits >> shift & 1:
+                value_range[0] = mid
+            else:
+                value_range[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+
+def circle(*geohashes: str) -> tuple[float, float, float]:
+    """Centre and radius in km of the circle around the tiles, ie the search
+    to fetch them with"""
+    edges = [bounds(geohash) for geohash in geohashes]
+    south = min(edge[0] for edge in edges)
+    north = max(edge[1] for edge in edges)
+    west = min(edge[2] for edge in edges)
+    east = max(edge[3] for edge in edges)
+    latitude = (south + north) / 2
+    longitude = (west + east) / 2
+    # The corners nearer the equator are the furthest from the centre
+    radius = max(
+        distance_km(latitude, longitude, south, east),
+        distance_km(latitude, longitude, north, east),
+    )
+    return latitude, longitude, radius
+
+
+def covering(
+    latitude: float, longitude: float, distance: float, precision: int
+) -> list[str]:
+    """Geohashes of the tiles of the precision that overlap the search circle"""
+    height, width = _cell_size(precision)
+    dlat = degrees(distance / EARTH_RADIUS_KM)
+    widest = min(89.0, abs(latitude) + dlat)
+    dlon = min(180.0, dlat / cos(radians(widest)))
+
+    rows = round(180 / height)
+    cols = round(360 / width)
+    first_row = max(0, floor((latitude - dlat + 90) / height))
+    last_row = min(rows - 1, floor((latitude + dlat + 90) / height))
+    first_col = max(0, floor((longitude - dlon + 180) / width))
+    last_col = min(cols - 1, floor((longitude + dlon + 180) / width))
+
+    geohashes = []
+    for row in range(first_row, last_row + 1):
+        south = row * height - 90
+        nearest_lat = min(max(latitude, south), south + height)
+        for col in range(first_col, last_col + 1):
+            west = col * width - 180
+            nearest_lon = min(max(longitude, west), west + width)
+            if distance_km(latitude, longitude, nearest_lat, nearest_lon) <= distance:
+                geohashes.append(
+                    encode(south + height / 2, west + width / 2, precision)
+                )
+    return geohashes
@@ -0,0 +1,174 @@
+"""Spatial index of the Australia Fuel Prices stations."""
+from __future__ import annotations
+
+from itertools import chain
+from math import cos, degrees, floor, radians
+
+import numpy as np
+
+from .aus_fuel_api import AusFuelStation
+from .const import GRID_CELL_DEGREES
+from .geohash import EARTH_RADIUS_KM
+
+
+def distances_km(
+    latitude: float, longitude: float, lats: np.ndarray, lons: np.ndarray
+) -> np.ndarray:
+    """Great circle distances from the point to each of the points"""
+    lat1 = np.radians(latitude)
+    lats = np.radians(lats)
+    a = (
+        np.sin((lats - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lats) * np.sin((np.radians(lons - longitude)) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class StationIndex:
+    """Locations of the stations in a grid of cells GRID_CELL_DEGREES square.
+
+    The locations are held in arrays, with each cell holding the positions of
+    its stations, so a search only measures the stations of the cells it
+    overlaps, all at once. version changes whenever a station is added,
+    moved or removed.
+    """
+
+    def __init__(self) -> None:
+        self.version = 0
+        self._positions: dict[str, int] = {}
+        self._ids: list[str | None] = []
+        self._free: list[int] = []
+        self._lats = np.empty(64)
+        self._lons = np.empty(64)
+        self._cells: dict[tuple[int, int], set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(self, record_id: str, latitude: float, longitude: float) -> None:
+        """Add the station, or move it if it is in the index"""
+        pos = self._positions.get(record_id)
+        if pos is not None:
+            if self._lats[pos] == latitude and self._lons[pos] == longitude:
+                return
+            self._discard(pos)
+        elif self._free:
+            pos = self._free.pop()
+        else:
+            pos = len(self._ids)
+            self._ids.append(None)
+            if pos == len(self._lats):
+                self._lats = np.resize(self._lats, pos * 2)
+                self._lons = np.resize(self._lons, pos * 2)
+
+        self._positions[record_id] = pos
+        self._ids[pos] = record_id
+        self._lats[pos] = latitude
+        self._lons[pos] = longitude
+        self._cells.setdefault(self._cell(latitude, longitude), set()).add(pos)
+        self.version += 1
+
+    def remove(self, record_id: str) -> None:
+        """Remove the station if it is in the index"""
+        pos = self._positions.pop(record_id, None)
+        if pos is None:
+            return
+        self._discard(pos)
+        self._ids[pos] = None
+        self._free.append(pos)
+        self.version += 1
+
+    def within(
+        self, latitude: float, longitude: float, distance: float
+    ) -> tuple[list[str], np.ndarray]:
+        """Stations within the distance in km of the point, nearest first,
+        and their distances"""
+        dlat = degrees(distance / EARTH_RADIUS_KM)
+        dlon = min(180.0, dlat / cos(radians(min(89.0, abs(latitude) + dlat))))
+        first_row, first_col = self._cell(latitude - dlat, longitude - dlon)
+        last_row, last_col = self._cell(latitude + dlat, longitude + dlon)
+
+        cells = (
+            self._cells.get((row, col), ())
+            for row in range(first_row, last_row + 1)
+            for col in range(first_col, last_col + 1)
+        )
+        positions = np.fromiter(chain.from_iterable(cells), dtype=np.intp)
+        found = distances_km(
+            latitude, longitude, self._lats[positions], self._lons[positions]
+        )
+        inside = found <= distance
+        positions = positions[inside]
+        found = found[inside]
+        order = np.argsort(found, kind="stable")
+        return [self._ids[pos] for pos in positions[order]], found[order]
+
+    def _discard(self, pos: int) -> None:
+        cell = self._cell(self._lats[pos], self._lons[pos])
+        self._cells[cell].discard(pos)
+        if not self._cells[cell]:
+            del self._cells[cell]
+
+    @staticmethod
+    def _cell(latitude: float, longitude: float) -> tuple[int, int]:
+        return floor(latitude / GRID_CELL_DEGREES), floor(longitude / GRID_CELL_DEGREES)
+
+
+class AusFuelRanking:
+    """The cheapest and the nearest station selling each fuel type within a
+    distance of a location, from the stations of the cache.
+
+    The stations in the distance are found from the index, nearest first, and
+    found again only when the index changes. The rankings are recomputed only
+    when the cache has new prices, once for all the sensors of the location.
+    """
+
+    def __init__(self, cache, latitude, longitude, distance, fuel_types) -> None:
+        self._cache = cache
+        self.latitude = latitude
+        self.longitude = longitude
+        self.distance = distance
+        self.fuel_types = fuel_types
+        self._versions: tuple[int, int] = None
+        self._stations: list[AusFuelStation] = []
+        self._distances = np.empty(0)
+        # Fuel type to the station and its distance, None if none sell it
+        self.cheapest: dict[str, tuple[AusFuelStation, float] | None] = {}
+        self.nearest: dict[str, tuple[AusFuelStation, float] | None] = {}
+
+    def update(self) -> None:
+        """Recompute after a refresh of the cache, if anything changed"""
+        index = self._cache.index
+        versions = (index.version, self._cache.version)
+        if versions == self._versions:
+            return
+        if self._versions is None or index.version != self._versions[0]:
+            record_ids, self._distances = index.within(
+                self.latitude, self.longitude, self.distance
+            )
+            self._stations = [self._cache.stations[rec_id] for rec_id in record_ids]
+        self._versions = versions
+
+        for fuel_type in self.fuel_types:
+            prices = np.fromiter(
+                (station.prices.get(fuel_type, np.nan) for station in self._stations),
+                dtype=float,
+                count=len(self._stations),
+            )
+            sold = ~np.isnan(prices)
+            if not sold.any():
+                self.cheapest[fuel_type] = None
+                self.nearest[fuel_type] = None
+                continue
+            # Nearest first, so the first selling it is the nearest, and the
+            # nearest of the cheapest is taken on a tie
+            nearest = int(np.argmax(sold))
+            cheapest = int(np.nanargmin(prices))
+            self.nearest[fuel_type] = (
+                self._stations[nearest],
+                float(self._distances[nearest]),
+            )
+            self.cheapest[fuel_type] = (
+                self._stations[cheapest],
+                float(self._distances[cheapest]),
+            )
@@ -0,0 +1,141 @@
+"""Incremental parser of the fuel price response."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+
+
+class FuelDataParser:
+    """Parse the fuel price response as it arrives, keeping only the stations
+    that are tracked.
+
+    The response is one object, {"message": "ok", "data": [...]}, with an
+    entry per station in data. Each data entry is decoded on its own as soon
+    as it is complete and passed to keep, which returns what to keep of it or
+    None to drop it. So only the entries being tracked are held, not the whole
+    response. The other values of the object, ie message, are kept as is.
+    """
+
+    def __init__(self, keep: Callable[[dict], dict | None] = None) -> None:
+        self.values: dict = {}
+        self.data: list = []
+        self._keep = keep
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = self._start
+        self._key: str = None
+
+    def feed(self, chunk: bytes, final: bool = False) -> None:
+        """Parse the next chunk of the response"""
+        self._buffer += self._text.decode(chunk, final)
+        pos = 0
+        while True:
+            next_pos = self._state(pos, final)
+            if next_pos is None:
+                break
+            pos = next_pos
+        self._buffer = self._buffer[pos:]
+
+    def close(self) -> None:
+        """End of the response, raising ValueError if it was incomplete"""
+        self.feed(b"", final=True)
+        if self._state != self._done:
+            raise ValueError("Fuel price response ended early")
+
+    # Each state parses from pos, returning the position after what it
+    # parsed, or None when it needs more of the response
+
+    def _start(self, pos: int, final: bool) -> int | None:
+        pos = self._skip(pos)
+        if pos is None:
+            return None
+        if self._buffer[pos] != "{":
+            raise ValueError("Fuel price response is not an object")
+        self._state = self._key_or_end
+        return pos + 1
+
+    def _key_or_end(self, pos: int, final: bool) -> int | None:
+        pos = self._skip(pos)
+        if pos is None:
+            return None
+        if self._buffer[pos] == "}":
+            self._state = self._done
+            return pos + 1
+        if self._buffer[pos] == ",":
+            return pos + 1
+        decoded = self._decode(pos, final)
+        if decoded is None:
+            return None
+        self._key, pos = decoded
+        self._state = self._colon
+        return pos
+
+    def _colon(self, pos: int, final: bool) -> int | None:
+        pos = self._skip(pos)
+        if pos is None:
+            return None
+        if self._buffer[pos] != ":":
+            raise ValueError("Fuel price response is not valid JSON")
+        self._state = self._value
+        return pos + 1
+
+    def _value(self, pos: int, final: bool) -> int | None:
+        pos = self._skip(pos)
+        if pos is None:
+            return None
+        if self._key == "data" and self._buffer[pos] == "[":
+            self._state = self._data_entry
+            return pos + 1
+        decoded = self._decode(pos, final)
+        if decoded is None:
+            return None
+        self.values[self._key], pos = decoded
+        self._state = self._key_or_end
+        return pos
+
+    def _data_entry(self, pos: int, final: bool) -> int | None:
+        pos = self._skip(pos)
+        if pos is None:
+            return None
+        if self._buffer[pos] == "]":
+            self._state = self._key_or_end
+            return pos + 1
+        if self._buffer[pos] == ",":
+            return pos + 1
+        decoded = self._decode(pos, final)
+        if decoded is None:
+            return None
+        entry, pos = decoded
+        if self._keep is not None:
+            entry = self._keep(entry)
+        if entry is not None:
+            self.data.append(entry)
+        return pos
+
+    def _done(self, pos: int, final: bool) -> int | None:
+        return None
+
+    def _skip(self, pos: int) -> int | None:
+        """Position of the next character that is not whitespace"""
+        buffer = self._buffer
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        return pos if pos < len(buffer) else None
+
+    def _decode(self, pos: int, final: bool) -> tuple | None:
+        """Decode the value at pos, None if it may not have all arrived. A
+        value ending the buffer may be a number cut short, so that waits for
+        more too"""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        if end == len(self._buffer) and not final:
+            return None
+        return value, end
@@ -10,11 +10,14 @@ from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
 )
 
-from .aus_fuel_api import AusFuelPrice
+from .aus_fuel_api import AusFuelStation, fuel_type_id
 
 from .const import DOMAIN
 import pprint
 
+# Statistics of the prices of a fuel type at the selected stations
+AGGREGATE_STATISTICS = {"min": "Lowest", "max": "Highest", "median": "Median"}
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
@@ -28,69 +31,247 @@ async def async_setup_entry(
 
     list = []
 
-    for (key, fuel_entry) in coordinator.data["prices"].items():
-        if fuel_entry.fuel_type in fuel_types and fuel_entry.station_id in stations:
+    for station in coordinator.data["stations"].values():
+        if station.id not in stations:
+            continue
+        for fuel_type in station.prices:
+            if fuel_type not in fuel_types:
+                continue
             if fuel_type_devices:
-                device = DeviceInfo(
-                    entry_type=DeviceEntryType.SERVICE,
-                    identifiers={(DOMAIN, fuel_entry.fuel_type)},
-                    manufacturer="Fuel Type",
-                    name=fuel_entry.fuel_type,
-                )
-                list.append(AusFuelPriceSensor(coordinator, key, fuel_entry, device))
+                device = fuel_type_device(fuel_type)
             else:
                 device = DeviceInfo(
                     entry_type=DeviceEntryType.SERVICE,
-                    identifiers={(DOMAIN, fuel_entry.name)},
-                    manufacturer=fuel_entry.brand,
-                    model=fuel_entry.address,
-                    name=fuel_entry.name,
+                    identifiers={(DOMAIN, station.name)},
+                    manufacturer=station.brand,
+                    model=station.address,
+                    name=station.name,
                 )
-                list.append(AusFuelPriceSensor(coordinator, key, fuel_entry, device))
+            list.append(AusFuelPriceSensor(coordinator, station, fuel_type, device))
+
+    # The cheapest and nearest of all the stations around the location, and
+    # the aggregates of the selected stations
+    for fuel_type in fuel_types:
+        if fuel_type_devices:
+            device = fuel_type_device(fuel_type)
+        else:
+            device = DeviceInfo(
+                entry_type=DeviceEntryType.SERVICE,
+                identifiers={(DOMAIN, entry.entry_id)},
+                manufacturer="Australian Fuel Prices",
+                name=entry.title,
+            )
+        list.append(AusFuelCheapestSensor(coordinator, entry, fuel_type, device))
+        list.append(AusFuelNearestSensor(coordinator, entry, fuel_type, device))
+        for statistic in AGGREGATE_STATISTICS:
+            list.append(
+                AusFuelAggregateSensor(coordinator, entry, fuel_type, statistic, device)
+            )
 
     pprint.pprint(list)
 
     async_add_entities(list)
 
 
+def fuel_type_device(fuel_type: str) -> DeviceInfo:
+    """Device of the sensors of the fuel type"""
+    return DeviceInfo(
+        entry_type=DeviceEntryType.SERVICE,
+        identifiers={(DOMAIN, fuel_type)},
+        manufacturer="Fuel Type",
+        name=fuel_type,
+    )
+
+
+def fuel_type_icon(fuel_type: str) -> str:
+    """Icon of the sensors of the fuel type"""
+    if "Diesel" in fuel_type:
+        return "mdi:truck"
+    if "E10" in fuel_type:
+        return "mdi:gas-station-outline"
+    return "mdi:gas-station"
+
+
 class AusFuelPriceSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Australian Fuel Price sensor."""
 
     def __init__(
         self,
         coordinator: DataUpdateCoordinator,
-        key: str,
-        price_entry: AusFuelPrice,
+        station: AusFuelStation,
+        fuel_type: str,
         device: DeviceInfo,
     ) -> None:
         """Initialize the Aus Fueld Price sensor."""
         super().__init__(coordinator)
-        self.price_entry = price_entry
-        self.price_id = key
-        self._attr_name = f"{price_entry.name} {price_entry.fuel_type}"
-        self._attr_unique_id = key
+        self.station = station
+        self.fuel_type = fuel_type
+        self._attr_name = f"{station.name} {fuel_type}"
+        self._attr_unique_id = station.price_id(fuel_type)
         self._attr_native_unit_of_measurement = "c/L"
         self._attr_state_class = SensorStateClass.MEASUREMENT
         self._attr_device_info = device
         self._attr_extra_state_attributes = {
-            "name": price_entry.name,
-            "address": price_entry.address,
-            "brand": price_entry.brand,
-            "latitude": price_entry.latitude,
-            "longitude": price_entry.longitude,
+            "name": station.name,
+            "address": station.address,
+            "brand": station.brand,
+            "latitude": station.latitude,
+            "longitude": station.longitude,
         }
-        if "Diesel" in price_entry.fuel_type:
-            self._attr_icon = "mdi:truck"
-        elif "E10" in price_entry.fuel_type:
-            self._attr_icon = "mdi:gas-station-outline"
-        else:
-            self._attr_icon = "mdi:gas-station"
+        self._attr_icon = fuel_type_icon(fuel_type)
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        if not self.coordinator.data:
+            return None
+        # The record of the station is updated in place on each refresh
+        station = self.coordinator.data["stations"].get(self.station.id, self.station)
+        return station.prices.get(self.fuel_type)
+
+
+class AusFuelRankingSensor(CoordinatorEntity, SensorEntity):
+    """Base of the sensors of the station ranked first for a fuel type among
+    those around the location of the entry."""
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        fuel_type: str,
+        ranking: str,
+        device: DeviceInfo,
+    ) -> None:
+        """Initialize the ranking sensor, of the ranking attribute of
+        AusFuelRanking, ie cheapest."""
+        super().__init__(coordinator)
+        self.fuel_type = fuel_type
+        self._ranking = ranking
+        self._attr_device_info = device
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    def _ranked(self) -> tuple[AusFuelStation, float] | None:
+        """The station ranked first and its distance, from the ranking"""
+        ranking = getattr(self.coordinator.data["ranking"], self._ranking)
+        return ranking.get(self.fuel_type)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the station ranked first."""
+        if not self.coordinator.data or (ranked := self._ranked()) is None:
+            return None
+        station, distance = ranked
+        return {
+            "name": station.name,
+            "address": station.address,
+            "brand": station.brand,
+            "latitude": station.latitude,
+            "longitude": station.longitude,
+            "price": station.prices.get(self.fuel_type),
+            "distance": round(distance, 2),
+        }
+
+
+class AusFuelCheapestSensor(AusFuelRankingSensor):
+    """Price of the cheapest station selling a fuel type within the search
+    distance of the entry."""
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        entry: ConfigEntry,
+        fuel_type: str,
+        device: DeviceInfo,
+    ) -> None:
+        """Initialize the cheapest price sensor."""
+        super().__init__(coordinator, fuel_type, "cheapest", device)
+        distance = entry.data["search_distance"]
+        self._attr_name = f"Cheapest {fuel_type} within {distance} km"
+        self._attr_unique_id = f"{entry.entry_id}_cheapest_{fuel_type_id(fuel_type)}"
+        self._attr_native_unit_of_measurement = "c/L"
+        self._attr_icon = fuel_type_icon(fuel_type)
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        if not self.coordinator.data or (ranked := self._ranked()) is None:
+            return None
+        return ranked[0].prices.get(self.fuel_type)
+
+
+class AusFuelNearestSensor(AusFuelRankingSensor):
+    """Distance in km to the nearest station selling a fuel type."""
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        entry: ConfigEntry,
+        fuel_type: str,
+        device: DeviceInfo,
+    ) -> None:
+        """Initialize the nearest station sensor."""
+        super().__init__(coordinator, fuel_type, "nearest", device)
+        self._attr_name = f"Nearest {fuel_type}"
+        self._attr_unique_id = f"{entry.entry_id}_nearest_{fuel_type_id(fuel_type)}"
+        self._attr_native_unit_of_measurement = "km"
+        self._attr_icon = "mdi:map-marker-distance"
 
     @property
     def native_value(self):
         """Return the state of the sensor."""
-        return (
-            getattr(self.coordinator.data["prices"][self.price_id], "price")
-            if self.coordinator.data
-            else None
+        if not self.coordinator.data or (ranked := self._ranked()) is None:
+            return None
+        return round(ranked[1], 2)
+
+
+class AusFuelAggregateSensor(CoordinatorEntity, SensorEntity):
+    """A statistic of the prices of a fuel type at the selected stations, the
+    lowest naming the cheapest station."""
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        entry: ConfigEntry,
+        fuel_type: str,
+        statistic: str,
+        device: DeviceInfo,
+    ) -> None:
+        """Initialize the aggregate sensor."""
+        super().__init__(coordinator)
+        self.fuel_type = fuel_type
+        self.statistic = statistic
+        self._attr_name = f"{fuel_type} {AGGREGATE_STATISTICS[statistic]} Price"
+        self._attr_unique_id = (
+            f"{entry.entry_id}_{statistic}_{fuel_type_id(fuel_type)}"
         )
+        self._attr_native_unit_of_measurement = "c/L"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_device_info = device
+        self._attr_icon = fuel_type_icon(fuel_type)
+
+    @property
+    def native_value(self):
+        """Return the state of the sensor."""
+        if not self.coordinator.data:
+            return None
+        aggregate = self.coordinator.data["aggregates"].fuel_types[self.fuel_type]
+        value = getattr(aggregate, self.statistic)
+        return round(value, 1) if value is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return the number of stations, and the cheapest of them."""
+        if not self.coordinator.data:
+            return None
+        aggregate = self.coordinator.data["aggregates"].fuel_types[self.fuel_type]
+        attributes = {"stations": len(aggregate)}
+        if self.statistic == "min" and aggregate.cheapest is not None:
+            station = self.coordinator.data["stations"].get(aggregate.cheapest)
+            if station is not None:
+                attributes.update(
+                    {
+                        "name": station.name,
+                        "address": station.address,
+                        "brand": station.brand,
+                    }
+                )
+        return attributes
@@ -2,22 +2,34 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, Platform
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.entity import DeviceInfo, Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
+    CONF_GATEWAY_HOST,
+    CONF_GATEWAY_PORT,
+    CONF_WORKER_PROCESS,
+    DEFAULT_GATEWAY_HOST,
     DOMAIN,
+    EVENT_INTERLOCK,
     SCAN_INTERVAL,
-    HA_COVER_ENTITIES,
-    HA_WATERING_AREAS,
-    HA_DEVICE2_ENTITIES,
+    S7Interlocks,
 )
+from .gateway import S7Gateway
+from .interlocks import S7InterlockDecoder
 from .s7comm import S7Addr, S7Comm, S7Bool, S7Word
+from .services import async_setup_services, async_unload_services
+from .tags import S7TagMap, load_tag_map
+from .worker import S7CommWorker
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -38,16 +50,46 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     hass.data.setdefault(DOMAIN, {})
     host = entry.data[CONF_HOST]
 
+    # Optionally keep snap7 out of the HA process, so a hang in native code
+    # cant stall HA. The local S7Comm then only holds the area registrations
     s7comm = S7Comm(host)
-    s7comm.get_cpu_state()
-    if not s7comm.comms_status:
-        raise ConfigEntryNotReady
+    worker = None
+    if entry.options.get(CONF_WORKER_PROCESS, False):
+        worker = S7CommWorker(hass, host)
+        try:
+            cpu_state = await worker.call("get_cpu_state")
+        except HomeAssistantError as err:
+            await worker.async_stop()
+            raise ConfigEntryNotReady from err
+        if cpu_state is None:
+            await worker.async_stop()
+            raise ConfigEntryNotReady
+    else:
+        s7comm.get_cpu_state()
+        if not s7comm.comms_status:
+            raise ConfigEntryNotReady
+
+    try:
+        coordinator = S7CommDataUpdateCoordinator(hass, s7comm, worker)
+        await coordinator.async_config_entry_first_refresh()
+
+        # Share the polled data with other clients, instead of them polling the PLC
+        if gateway_port := entry.options.get(CONF_GATEWAY_PORT, 0):
+            gateway_host = entry.options.get(CONF_GATEWAY_HOST, DEFAULT_GATEWAY_HOST)
+            gateway = S7Gateway(hass, coordinator, gateway_host, gateway_port)
+            await gateway.async_start()
+            entry.async_on_unload(gateway.async_stop)
+    except BaseException:
+        # Else each retry of the setup leaves a worker and its memory behind
+        if worker is not None:
+            await worker.async_stop()
+        raise
 
-    coordinator = S7CommDataUpdateCoordinator(hass, s7comm)
-    await coordinator.async_config_entry_first_refresh()
     hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    async_setup_services(hass)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
@@ -55,20 +97,59 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_stop()
+        if not hass.data[DOMAIN]:
+            async_unload_services(hass)
 
     return unload_ok
 
 
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+def _tag_signature(entity: Entity) -> str:
+    """Everything a newly created entity was built with from its tag, but its
+    coordinator. Entities set all of it in __init__, so two built from the
+    same tag have the same signature, and any change to the tag, ie its icon,
+    device class, layout or addresses, changes it"""
+    return repr(
+        sorted(
+            (key, value)
+            for key, value in vars(entity).items()
+            if key != "coordinator"
+        )
+    )
+
+
 class S7CommDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching S7 PLC data."""
 
     # All entities should read data from this coordinator's data
     # attribute, updated by the _async_update_data function
 
-    def __init__(self, hass, s7comm: S7Comm):
+    def __init__(self, hass, s7comm: S7Comm, worker: S7CommWorker = None):
         """Initialize global s7comm data updater."""
         self.s7comm: S7Comm = s7comm
+        self._worker = worker
+        self.tags: S7TagMap = load_tag_map()
+
+        # Entities created from the tags by each platform, by unique id, so a
+        # reload of the tags only adds and removes the entities that changed
+        self._tag_entities: dict[str, tuple] = {}
+
+        # DB areas registered for the tags, as opposed to fixed registrations
+        self._tag_areas: set[str] = set()
+
+        # Interlocks of every cover and device, decoded together each update
+        self._interlock_devices = {
+            str(desc.s7_interlocks): desc for desc in self.tags.devices
+        }
+        self._interlock_decoder = S7InterlockDecoder(
+            [desc.s7_interlocks for desc in self.tags.devices], self.tags.interlocks
+        )
 
         super().__init__(
             hass,
@@ -79,33 +160,135 @@ class S7CommDataUpdateCoordinator(DataUpdateCoordinator):
 
     def get_bool(self, s7addr: S7Bool):
         """Read the boolean value of the supplied S7Addr"""
-        db_data = self.data[f"DB{s7addr.db}"]
+        db_data = self.data.get(s7addr.key)
         return s7addr.get_bool(db_data)
 
     def get_int(self, s7addr: S7Word):
         """Read the integer value of the supplied S7Addr"""
-        db_data = self.data[f"DB{s7addr.db}"]
+        db_data = self.data.get(s7addr.key)
         return s7addr.get_int(db_data)
 
+    def get_interlocks(self, s7addr: S7Word) -> tuple[S7Interlocks, ...]:
+        """Active interlocks of the supplied interlock word S7Addr"""
+        return self._interlock_decoder.active.get(str(s7addr), ())
+
     async def write_int(self, s7addr: S7Addr, value: int):
         """Write the given integer to the S7Addr"""
-        self.s7comm.write_int(s7addr, value)
+        await self._s7_call("write_int", s7addr, value)
+
+    async def read_values(self, s7addrs: list[S7Addr], fmt: str = None) -> list[Any]:
+        """Read the values of all the S7Addrs in one batched request"""
+        data = await self._s7_call("read_multi", s7addrs)
+        if data is None:
+            raise HomeAssistantError("Step7 PLC read failed")
+
+        return [
+            None if value is None else s7addr.decode(value, fmt)
+            for s7addr, value in zip(s7addrs, data)
+        ]
+
+    async def write_values(self, values: list[tuple[S7Addr, Any]], fmt: str = None):
+        """Write the values to each S7Addr in one batched request"""
+        data = [(s7addr, s7addr.encode(value, fmt)) for s7addr, value in values]
+        if not await self._s7_call("write_multi", data):
+            raise HomeAssistantError("Step7 PLC write failed")
+
+    async def write_blocks(self, blocks: list[tuple[S7Addr, bytearray]]):
+        """Write each block in one batched request, then read the same blocks
+        back in one request so entities update without waiting for a full poll"""
+        if not await self._s7_call("write_multi", blocks):
+            raise HomeAssistantError("Step7 PLC write failed")
+
+        s7addrs = [s7addr for s7addr, _ in blocks]
+        data = await self._s7_call("read_multi", s7addrs)
+        if data is None:
+            await self.async_request_refresh()
+            return
+
+        for s7addr, value in zip(s7addrs, data):
+            self._patch_db_data(s7addr, value)
+        self.async_update_listeners()
+
+    def _patch_db_data(self, s7addr: S7Addr, value: bytearray):
+        """Update the DB image held by this coordinator with freshly read data"""
+        db_data = (self.data or {}).get(s7addr.key)
+        end = s7addr.byte + s7addr.size
+        if value is None or db_data is None or len(db_data) < end:
+            return
+        db_data[s7addr.byte : end] = value
 
     def register_dbs(self):
-        # Register all the cover entities with the s7comm driver, this might happen in mutiple entities but
+        # Register the DBs of all the tags with the s7comm driver, this might happen in mutiple entities but
         # better to do muitple times as no garrantee of the order of setup of the entities
-        [
-            self.s7comm.register_db(desc.s7datablock, 0, desc.s7readbytes)
-            for desc in HA_COVER_ENTITIES
-        ]
-        [
-            self.s7comm.register_db(desc.s7datablock, 0, desc.s7readbytes)
-            for desc in HA_DEVICE2_ENTITIES
-        ]
-        [
-            self.s7comm.register_db(desc.s7datablock, 0, desc.s7readbytes)
-            for desc in HA_WATERING_AREAS
-        ]
+        db_sizes = self.tags.db_sizes()
+        for db_number, size in db_sizes.items():
+            self.s7comm.register_db(db_number, 0, size)
+
+        # Stop reading DBs no longer used by any tag
+        tag_areas = {f"DB{db_number}" for db_number in db_sizes}
+        for key in self._tag_areas - tag_areas:
+            self.s7comm.unregister_area(key)
+        self._tag_areas = tag_areas
+
+    @callback
+    def async_add_tag_entities(
+        self,
+        platform: Platform,
+        async_add_entities: AddEntitiesCallback,
+        create_entities: Callable[[S7CommDataUpdateCoordinator, S7TagMap], list],
+    ) -> None:
+        """Add the entities the platform creates from the tags, keeping the
+        factory so they can be recreated when the tags are reloaded"""
+        entities = {
+            entity.unique_id: (entity, _tag_signature(entity))
+            for entity in create_entities(self, self.tags)
+        }
+        self._tag_entities[platform] = (async_add_entities, create_entities, entities)
+        async_add_entities([entity for entity, _ in entities.values()])
+
+    async def async_reload_tags(self) -> None:
+        """Reload the tags from const.py, without reconnecting to the PLC.
+
+        Only the areas and interlock words that changed are re-registered, the
+        images of the others are kept. Entities are only removed and added
+        when their tag was removed, added or changed in any way."""
+        tags = await self.hass.async_add_executor_job(load_tag_map, True)
+        self.tags = tags
+        self.register_dbs()
+        self._interlock_devices = {
+            str(desc.s7_interlocks): desc for desc in tags.devices
+        }
+        self._interlock_decoder.set_addresses(
+            [desc.s7_interlocks for desc in tags.devices], tags.interlocks
+        )
+
+        # Read any new areas before their entities are added
+        await self.async_refresh()
+
+        registry = er.async_get(self.hass)
+        for async_add_entities, create_entities, entities in self._tag_entities.values():
+            added = {
+                entity.unique_id: (entity, _tag_signature(entity))
+                for entity in create_entities(self, tags)
+            }
+            for unique_id in list(entities):
+                entity: Entity
+                entity, signature = entities[unique_id]
+                new_entity = added.get(unique_id)
+                if new_entity is not None and new_entity[1] == signature:
+                    del added[unique_id]
+                    continue
+
+                # Removed, or replaced as its tag changed, keeping the registry
+                # entry of a replaced entity so its entity id and settings stay
+                del entities[unique_id]
+                await entity.async_remove()
+                if new_entity is None and entity.registry_entry is not None:
+                    registry.async_remove(entity.entity_id)
+
+            if added:
+                entities.update(added)
+                async_add_entities([entity for entity, _ in added.values()])
 
     async def _async_update_data(self):
         """Fetch data from Step 7 CPU."""
@@ -113,20 +296,69 @@ class S7CommDataUpdateCoordinator(DataUpdateCoordinator):
         coord_data = {}
 
         # Update and make sure we are still connected at end of update
-        self.s7comm.update_dbs()
+        comms_status, cpu_state, db_data = await self._update_dbs()
 
-        coord_data["COMMS_STATUS"] = self.s7comm.comms_status == False
-        if not self.s7comm.comms_status:
+        coord_data["COMMS_STATUS"] = comms_status == False
+        if not comms_status:
             raise UpdateFailed("Step7 PLC connection issue")
 
         # Create dictionary for ["data"] of coorindator in the format
-        coord_data["CPU_STATE"] = self.s7comm.get_cpu_state() == "Run"
-        db_data = self.s7comm.get_db_data()
-        for db_number in db_data:
-            coord_data[f"DB{db_number}"] = db_data[db_number]["data"]
+        coord_data["CPU_STATE"] = cpu_state == "Run"
+        coord_data.update(db_data)
+
+        self._update_interlocks(coord_data)
+
+        # The images are now the data, the worker must not write over them
+        if self._worker is not None:
+            self._worker.adopt()
 
         return coord_data
 
+    async def _update_dbs(self) -> tuple[bool, str, dict]:
+        """Read all registered areas, returning the comms status, cpu state
+        and area images"""
+        if self._worker is not None:
+            try:
+                return await self._worker.update_dbs(self.s7comm.get_read_areas())
+            except HomeAssistantError as err:
+                raise UpdateFailed(str(err)) from err
+
+        self.s7comm.update_dbs()
+        if not self.s7comm.comms_status:
+            return False, None, {}
+        return True, self.s7comm.get_cpu_state(), self.s7comm.get_db_data()
+
+    async def _s7_call(self, method: str, *args) -> Any:
+        """Call the S7Comm method, in the worker process if there is one"""
+        if self._worker is not None:
+            return await self._worker.call(method, *args)
+        return getattr(self.s7comm, method)(*args)
+
+    async def get_read_plan(self) -> dict[str, Any]:
+        """The read plan the PLC is being polled with"""
+        return await self._s7_call("get_read_plan")
+
+    async def async_stop(self):
+        """Stop the worker process, if there is one"""
+        if self._worker is not None:
+            await self._worker.async_stop()
+
+    def _update_interlocks(self, coord_data: dict):
+        """Decode all interlock words, firing an event for each device whose
+        active interlocks changed"""
+        for address, previous in self._interlock_decoder.update(coord_data).items():
+            active = self._interlock_decoder.active[address]
+            self.hass.bus.async_fire(
+                EVENT_INTERLOCK,
+                {
+                    "address": address,
+                    "name": self._interlock_devices[address].name,
+                    "active": [interlock.name for interlock in active],
+                    "raised": [i.name for i in active if i not in previous],
+                    "cleared": [i.name for i in previous if i not in active],
+                },
+            )
+
     def get_device(self):
         return DeviceInfo(
             identifiers={(DOMAIN, "PLC")},
@@ -7,6 +7,7 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
 )
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.components.binary_sensor import BinarySensorEntityDescription
@@ -15,8 +16,9 @@ from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
 )
 
-from .const import DOMAIN, STATUS_BINARY_ENTITIES, HA_WATERING_AREAS
+from .const import DOMAIN, STATUS_BINARY_ENTITIES
 from .s7comm import S7Bool
+from .tags import S7TagMap
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -31,6 +33,7 @@ async def async_setup_entry(
 
     coordinator.s7comm.register_db(252, 14, 16)  # Front Deck Motion
     coordinator.s7comm.register_db(150, 14, 16)  # PLC Cabinet Open
+    coordinator.register_dbs()
 
     # Now we have told the coorindator about what DB's to load
     # wait until the next update before we start adding entities
@@ -54,24 +57,29 @@ async def async_setup_entry(
         ]
     )
 
-    # Watering areas
-    async_add_entities(
-        [
-            S7BoolEntity(
-                coordinator,
-                BinarySensorDeviceClass.PROBLEM,
-                f"{description.name} Available",
-                description.s7datablock,
-                8,
-                1,
-                True,
-                description.device,
-            )
-            for description in HA_WATERING_AREAS
-        ]
+    coordinator.async_add_tag_entities(
+        Platform.BINARY_SENSOR, async_add_entities, _create_tag_entities
     )
 
 
+def _create_tag_entities(coordinator, tags: S7TagMap) -> list:
+    """Create the binary sensor entities of the tags"""
+    # Watering areas
+    return [
+        S7BoolEntity(
+            coordinator,
+            BinarySensorDeviceClass.PROBLEM,
+            f"{description.name} Available",
+            description.s7datablock,
+            8,
+            1,
+            True,
+            description.device,
+        )
+        for description in tags.watering_areas
+    ]
+
+
 class S7BoolEntity(CoordinatorEntity, BinarySensorEntity):
     """Binary sensor representing a boolean in a S7 PLC."""
 
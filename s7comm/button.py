@@ -6,6 +6,7 @@ from homeassistant.components.button import (
 )
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
@@ -15,10 +16,10 @@ from homeassistant.helpers.update_coordinator import (
 
 from .const import (
     DOMAIN,
-    HA_WATERING_AREAS,
     HAWateringAreaDescription,
 )
 from .s7comm import S7Bool, S7Comm, S7DWord, S7Word
+from .tags import S7TagMap
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -42,31 +43,33 @@ async def async_setup_entry(
     coordinator.register_dbs()
     await coordinator.async_config_entry_first_refresh()
 
-    # Watering areas
-    async_add_entities(
-        [
-            S7WateringCmdEntity(
-                coordinator,
-                description,
-                "Equipment to Automatic",
-                FORCE_AUTO_CMD,
-            )
-            for description in HA_WATERING_AREAS
-        ]
-    )
-    async_add_entities(
-        [
-            S7WateringCmdEntity(
-                coordinator,
-                description,
-                "Manual Start",
-                MAN_START_CMD,
-            )
-            for description in HA_WATERING_AREAS
-        ]
+    coordinator.async_add_tag_entities(
+        Platform.BUTTON, async_add_entities, _create_tag_entities
     )
 
 
+def _create_tag_entities(coordinator, tags: S7TagMap) -> list:
+    """Create the button entities of the tags"""
+    # Watering areas
+    return [
+        S7WateringCmdEntity(
+            coordinator,
+            description,
+            "Equipment to Automatic",
+            FORCE_AUTO_CMD,
+        )
+        for description in tags.watering_areas
+    ] + [
+        S7WateringCmdEntity(
+            coordinator,
+            description,
+            "Manual Start",
+            MAN_START_CMD,
+        )
+        for description in tags.watering_areas
+    ]
+
+
 class S7IntCommandEntity(CoordinatorEntity, ButtonEntity):
     """Home Assistant Command as integer in a S7 PLC."""
 
@@ -3,8 +3,15 @@ import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST
+from homeassistant.core import callback
 
-from .const import DOMAIN
+from .const import (
+    CONF_GATEWAY_HOST,
+    CONF_GATEWAY_PORT,
+    CONF_WORKER_PROCESS,
+    DEFAULT_GATEWAY_HOST,
+    DOMAIN,
+)
 from .s7comm import S7Comm
 
 DATA_SCHEMA = vol.Schema({vol.Required(CONF_HOST): str})
@@ -15,6 +22,12 @@ class S7CommConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return S7CommOptionsFlow(config_entry)
+
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
         if user_input is None:
@@ -47,3 +60,37 @@ class S7CommConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_HOST: user_input[CONF_HOST],
             },
         )
+
+
+class S7CommOptionsFlow(config_entries.OptionsFlow):
+    """Handle S7Comm options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_WORKER_PROCESS,
+                        default=options.get(CONF_WORKER_PROCESS, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_GATEWAY_PORT,
+                        default=options.get(CONF_GATEWAY_PORT, 0),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=65535)),
+                    vol.Optional(
+                        CONF_GATEWAY_HOST,
+                        default=options.get(CONF_GATEWAY_HOST, DEFAULT_GATEWAY_HOST),
+                    ): str,
+                }
+            ),
+        )
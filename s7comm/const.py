@@ -15,13 +15,42 @@ from homeassistant.const import (
     ELECTRIC_POTENTIAL_VOLT,
     TEMP_CELSIUS,
 )
-from .s7comm import S7Addr
+from .s7comm import S7Addr, S7Bytes, S7Word
 
 """Constants for the Step7 PLC integration."""
 
 DOMAIN = "s7comm"
 SCAN_INTERVAL: Final = timedelta(seconds=1)
 
+# Options
+CONF_WORKER_PROCESS = "worker_process"
+CONF_GATEWAY_PORT = "gateway_port"
+CONF_GATEWAY_HOST = "gateway_host"
+
+# The gateway is unauthenticated, so by default only local clients may connect
+DEFAULT_GATEWAY_HOST = "127.0.0.1"
+
+# Fired when the active interlocks of a cover or device change
+EVENT_INTERLOCK = f"{DOMAIN}_interlock"
+
+# Watering area schedule limits
+MIN_START_HOURS = 0
+MAX_START_HOURS = 23
+MIN_RUN_MINS = 0
+MAX_RUN_MINS = 1440
+
+# Watering area run time days, in the order they are stored in the DB
+INT_TO_DAY_MAP = {
+    0: "Manual",
+    1: "Sunday",
+    2: "Monday",
+    3: "Tuesday",
+    4: "Wednesday",
+    5: "Thursday",
+    6: "Friday",
+    7: "Saturday",
+}
+
 
 @dataclass
 class S7Interlocks:
@@ -50,6 +79,11 @@ class HAGenericEntityDescription(EntityDescription):
     s7readbytes: int = None
     disable_switch: bool = False
 
+    @property
+    def s7_interlocks(self) -> S7Word:
+        """Interlock word, one bit per entry in interlock_template"""
+        return S7Word(self.s7datablock, 2)
+
 
 @dataclass
 class HAWateringAreaDescription(EntityDescription):
@@ -68,6 +102,52 @@ class HAWateringAreaDescription(EntityDescription):
             model="Watering Area",
         )
 
+    @property
+    def s7_start_hour(self) -> S7Word:
+        """Start hour of the watering schedule"""
+        return S7Word(self.s7datablock, 12)
+
+    def s7_run_minutes(self, day: int) -> S7Word:
+        """Run minutes for the day, as numbered in INT_TO_DAY_MAP"""
+        return S7Word(self.s7datablock, 14 + day * 2)
+
+    @property
+    def s7_schedule(self) -> S7Bytes:
+        """Whole schedule, the start hour followed by the run minutes for each day"""
+        return S7Bytes(self.s7datablock, 12, 2 + len(INT_TO_DAY_MAP) * 2)
+
+
+@dataclass
+class S7DeviceLayout:
+    """Where the status of a type of device is held in its DB"""
+
+    available: tuple[int, int] = None
+    automatic: tuple[int, int] = None
+    disabled: tuple[int, int] = None
+    on_today: int = None
+    on_yesterday: int = None
+    on_name: str = "On"
+
+
+# Status of a device as shown by its status sensor, in order of precedence
+DEVICE_STATUS_OPTIONS = ["None", "User Control", "Automatic", "Disabled", "Interlocked"]
+
+COVER_LAYOUT = S7DeviceLayout(
+    available=(12, 5),
+    automatic=(14, 0),
+    disabled=(14, 5),
+    on_today=18,
+    on_yesterday=20,
+    on_name="Open",
+)
+
+DEVICE2_LAYOUT = S7DeviceLayout(
+    available=(8, 2),
+    automatic=(10, 0),
+    disabled=(10, 3),
+    on_today=14,
+    on_yesterday=16,
+)
 
 interlock_template = [
     S7Interlocks(number=1),
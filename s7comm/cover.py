@@ -10,15 +10,16 @@ from homeassistant.components.cover import (
     CoverEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
 )
-from homeassistant.const import STATE_ON, STATE_OFF
-from .const import DOMAIN, HA_COVER_ENTITIES, HAGenericEntityDescription
+from homeassistant.const import STATE_ON, STATE_OFF, Platform
+from .const import DOMAIN, HAGenericEntityDescription
 from .s7comm import S7Bool, S7Comm, S7DWord, S7Word
+from .tags import S7TagMap
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,11 +40,16 @@ async def async_setup_entry(
     coordinator.register_dbs()
     await coordinator.async_config_entry_first_refresh()
 
-    async_add_entities(
-        [S7HaCover(coordinator, description) for description in HA_COVER_ENTITIES]
+    coordinator.async_add_tag_entities(
+        Platform.COVER, async_add_entities, _create_tag_entities
     )
 
 
+def _create_tag_entities(coordinator, tags: S7TagMap) -> list:
+    """Create the cover entities of the tags"""
+    return [S7HaCover(coordinator, description) for description in tags.covers]
+
+
 class S7HaCover(CoordinatorEntity, CoverEntity):
     """Home Assistant Cover in a S7 PLC."""
 
@@ -60,7 +66,7 @@ class S7HaCover(CoordinatorEntity, CoverEntity):
         self._db_number = description.s7datablock
 
         # Addresses in the DB
-        self._s7_interlocks = S7Word(description.s7datablock, 2)
+        self._s7_interlocks = description.s7_interlocks
         self._s7_available = S7Bool(description.s7datablock, 12, 5)
         self._s7_auto_available = S7Bool(description.s7datablock, 12, 6)
         self._s7_is_automatic = S7Bool(description.s7datablock, 14, 0)
@@ -70,8 +76,6 @@ class S7HaCover(CoordinatorEntity, CoverEntity):
         self._s7_fault = S7Bool(description.s7datablock, 14, 4)
         self._s7_disabled = S7Bool(description.s7datablock, 14, 5)
         self._s7_command = S7Word(description.s7datablock, 16)
-        self._s7_open_tday = S7Word(description.s7datablock, 18)
-        self._s7_open_yday = S7Word(description.s7datablock, 20)
 
         # Rely on the parent class implementation for these attributes
         self._attr_name = description.name
@@ -79,47 +83,37 @@ class S7HaCover(CoordinatorEntity, CoverEntity):
         self._attr_device_class = description.device_class
         self._attr_unique_id = f"DB{self._db_number}_cover"
         self._attr_device_info = coordinator.get_device()
-        self._attr_extra_state_attributes = {}
-
-    def update_time_attrs(self):
-        """Update the time open today and yday attributes"""
-        self._attr_extra_state_attributes[
-            f"Time Open Today"
-        ] = f"{self.coordinator.get_int(self._s7_open_tday)} min"
-        self._attr_extra_state_attributes[
-            f"Time Open YDay"
-        ] = f"{self.coordinator.get_int(self._s7_open_yday)} min"
-
-        disabled = self.coordinator.get_bool(self._s7_disabled)
-        available = self.coordinator.get_bool(self._s7_available)
-        auto = self.coordinator.get_bool(self._s7_is_automatic)
-        interlocked = self.coordinator.get_int(self._s7_interlocks) != 0
-        self._attr_extra_state_attributes["Status"] = "None"
-        if available:
-            self._attr_extra_state_attributes["Status"] = "User Control"
-        if available and auto:
-            self._attr_extra_state_attributes["Status"] = "Automatic"
-        if disabled:
-            self._attr_extra_state_attributes["Status"] = "Disabled"
-        if interlocked:
-            self._attr_extra_state_attributes["Status"] = "Interlocked"
+        self._last_state = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state when the cover state itself changes, the run times
+        and status are written by their own sensors"""
+        state = (
+            self.available,
+            self.is_closed,
+            self.is_closing,
+            self.is_opening,
+            self.supported_features,
+        )
+        if state == self._last_state:
+            return
+        self._last_state = state
+        self.async_write_ha_state()
 
     @property
     def is_closed(self):
         """Return if cover is fully closed."""
-        self.update_time_attrs()
         return self.coordinator.get_bool(self._s7_is_closed)
 
     @property
     def is_closing(self):
         """Return if cover is closing."""
-        self.update_time_attrs()
         return self.coordinator.get_bool(self._s7_is_closing)
 
     @property
     def is_opening(self):
         """Return if cover is opening."""
-        self.update_time_attrs()
         return self.coordinator.get_bool(self._s7_is_opening)
 
     @property
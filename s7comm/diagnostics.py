@@ -0,0 +1,33 @@
+"""Diagnostics support for the Step7 PLC integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry, including the read plan chosen
+    and the timings it was chosen by"""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "read_areas": {
+            key: str(s7addr)
+            for key, s7addr in coordinator.s7comm.get_read_areas().items()
+        },
+        "read_plan": await coordinator.get_read_plan(),
+    }
@@ -0,0 +1,150 @@
+"""Read-only gateway sharing the coordinator's PLC data with other clients."""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Changed byte ranges closer than this are sent as one range
+MERGE_GAP = 4
+
+# Clients that fall this far behind are disconnected rather than buffered
+MAX_CLIENT_BUFFER = 1024 * 1024
+
+
+class S7Gateway:
+    """Stream the latest area images and their changes to TCP clients.
+
+    Messages are newline delimited JSON. On connecting a client is sent a
+    snapshot of every area image, then after each PLC poll a message with only
+    the changed byte ranges. Anything sent by clients is ignored, so the PLC
+    is still polled once however many clients there are.
+
+    There is no authentication, any client that can reach the host and port
+    is sent the data, so it listens on the loopback address unless another
+    host is given.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinator: DataUpdateCoordinator,
+        host: str,
+        port: int,
+    ) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._host = host
+        self._port = port
+        self._server = None
+        self._unsub = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._images: dict[str, bytes] = {}
+        self._status: dict[str, bool] = {}
+
+    async def async_start(self) -> None:
+        """Start listening for clients and following the coordinator"""
+        self._snapshot()
+        self._server = await asyncio.start_server(
+            self._handle_client, host=self._host, port=self._port
+        )
+        self._unsub = self._coordinator.async_add_listener(self._publish)
+        _LOGGER.debug("Step7 PLC gateway listening on %s:%s", self._host, self._port)
+
+    async def async_stop(self) -> None:
+        """Disconnect all clients and stop listening"""
+        if self._unsub is not None:
+            self._unsub()
+        for writer in list(self._clients):
+            writer.close()
+        self._clients.clear()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._send(
+            writer,
+            {
+                "type": "snapshot",
+                **self._status,
+                "areas": {key: data.hex() for key, data in self._images.items()},
+            },
+        )
+        self._clients.add(writer)
+        try:
+            # Read only, drain whatever the client sends until it disconnects
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    @callback
+    def _publish(self) -> None:
+        """Send the changes of the latest poll to all clients"""
+        status = self._status
+        images = self._images
+        self._snapshot()
+
+        changes = []
+        for key, data in self._images.items():
+            old = images.get(key)
+            if old is None or len(old) != len(data):
+                changes.append({"area": key, "offset": 0, "data": data.hex()})
+                continue
+            for start, end in _changed_ranges(old, data):
+                changes.append({"area": key, "offset": start, "data": data[start:end].hex()})
+
+        if not changes and status == self._status:
+            return
+        message = {"type": "change", **self._status, "changes": changes}
+        for writer in list(self._clients):
+            self._send(writer, message)
+
+    def _snapshot(self) -> None:
+        """Copy the coordinator's data, so changes can be found next poll"""
+        data = self._coordinator.data or {}
+        self._status = {
+            "cpu_running": data.get("CPU_STATE"),
+            "comms_fail": data.get("COMMS_STATUS"),
+        }
+        self._images = {
+            key: bytes(value)
+            for key, value in data.items()
+            if key not in ("CPU_STATE", "COMMS_STATUS") and value is not None
+        }
+
+    def _send(self, writer: asyncio.StreamWriter, message: dict) -> None:
+        if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            _LOGGER.debug("Step7 PLC gateway client too slow, disconnecting")
+            self._clients.discard(writer)
+            writer.close()
+            return
+        writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+
+
+def _changed_ranges(old: bytes, new: bytes) -> list[tuple[int, int]]:
+    """Start and end of each run of changed bytes"""
+    changed = np.flatnonzero(
+        np.frombuffer(old, dtype=np.uint8) != np.frombuffer(new, dtype=np.uint8)
+    )
+    if changed.size == 0:
+        return []
+
+    # Split wherever consecutive changed bytes are further apart than the gap
+    splits = np.flatnonzero(np.diff(changed) > MERGE_GAP) + 1
+    return [
+        (int(run[0]), int(run[-1]) + 1) for run in np.split(changed, splits)
+    ]
@@ -0,0 +1,83 @@
+"""Decoding of the interlock words of Step7 PLC devices."""
+from __future__ import annotations
+
+import numpy as np
+
+from .const import S7Interlocks
+from .s7comm import S7Word
+
+
+class S7InterlockDecoder:
+    """Expand the interlock word of every device into per bit states.
+
+    All the words are gathered from the DB images and decoded together in one
+    numpy pass, the tuple of active interlocks is only rebuilt for devices
+    whose word changed since the last update. Bit n of a word is the nth
+    interlock of the template.
+    """
+
+    def __init__(
+        self, s7addrs: list[S7Word], template: tuple[S7Interlocks, ...]
+    ) -> None:
+        self._s7addrs = list(s7addrs)
+        self._template = tuple(template)
+        self._bit_shifts = np.arange(len(self._template), dtype=np.uint16)
+        self._states = np.zeros((len(s7addrs), len(self._template)), dtype=bool)
+        self.active: dict[str, tuple[S7Interlocks, ...]] = {
+            str(s7addr): () for s7addr in s7addrs
+        }
+
+    def set_addresses(
+        self, s7addrs: list[S7Word], template: tuple[S7Interlocks, ...]
+    ) -> None:
+        """Change the decoded words and template in place, keeping the states
+        of words that are still decoded so their interlocks are not reported
+        again. Their active interlocks are taken from the new template"""
+        template = tuple(template)
+        bits = min(len(template), len(self._template))
+        rows = {str(s7addr): row for row, s7addr in enumerate(self._s7addrs)}
+        states = np.zeros((len(s7addrs), len(template)), dtype=bool)
+        for row, s7addr in enumerate(s7addrs):
+            if (old_row := rows.get(str(s7addr))) is not None:
+                states[row, :bits] = self._states[old_row, :bits]
+
+        self._template = template
+        self._bit_shifts = np.arange(len(template), dtype=np.uint16)
+        self.active = {
+            str(s7addr): self._active(states[row])
+            for row, s7addr in enumerate(s7addrs)
+        }
+        self._s7addrs = list(s7addrs)
+        self._states = states
+
+    def update(self, data: dict) -> dict[str, tuple[S7Interlocks, ...]]:
+        """Decode the interlock words, returning the previous active interlocks
+        of each address whose interlocks changed"""
+        if not self._s7addrs:
+            return {}
+
+        # Unavailable images decode as no interlocks active
+        words = b"".join(
+            _word_bytes(data.get(s7addr.key), s7addr.byte) for s7addr in self._s7addrs
+        )
+        values = np.frombuffer(words, dtype=">u2").astype(np.uint16)
+        states = ((values[:, None] >> self._bit_shifts) & 1).astype(bool)
+
+        changed = {}
+        for row in np.flatnonzero(np.any(states != self._states, axis=1)):
+            key = str(self._s7addrs[row])
+            changed[key] = self.active[key]
+            self.active[key] = self._active(states[row])
+        self._states = states
+
+        return changed
+
+    def _active(self, states: np.ndarray) -> tuple[S7Interlocks, ...]:
+        return tuple(self._template[bit] for bit in np.flatnonzero(states))
+
+
+def _word_bytes(db_data, byte: int) -> bytes:
+    """Two bytes of the word at byte, zeros if not available"""
+    if db_data is None or len(db_data) < byte + 2:
+        return bytes(2)
+    return bytes(db_data[byte : byte + 2])
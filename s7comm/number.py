@@ -4,6 +4,7 @@ import logging
 from homeassistant.components.number import NumberEntity, NumberMode
 
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
@@ -13,18 +14,17 @@ from homeassistant.helpers.update_coordinator import (
 
 from .const import (
     DOMAIN,
-    HA_WATERING_AREAS,
+    INT_TO_DAY_MAP,
+    MAX_RUN_MINS,
+    MAX_START_HOURS,
+    MIN_RUN_MINS,
+    MIN_START_HOURS,
     HAWateringAreaDescription,
 )
-from .s7comm import S7Word
+from .tags import S7TagMap
 
 _LOGGER = logging.getLogger(__name__)
 
-MIN_START_HOURS = 0
-MAX_START_HOURS = 23
-MIN_RUN_MINS = 0
-MAX_RUN_MINS = 1440
-
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -42,32 +42,22 @@ async def async_setup_entry(
     coordinator.register_dbs()
     await coordinator.async_config_entry_first_refresh()
 
-    # Watering areas
-    async_add_entities(
-        [
-            HaWateringAreaStartTime(coordinator, description)
-            for description in HA_WATERING_AREAS
-        ]
-    )
-    async_add_entities(
-        [
-            HaWateringRunTime(coordinator, description, day)
-            for day in INT_TO_DAY_MAP
-            for description in HA_WATERING_AREAS
-        ]
+    coordinator.async_add_tag_entities(
+        Platform.NUMBER, async_add_entities, _create_tag_entities
     )
 
 
-INT_TO_DAY_MAP = {
-    0: "Manual",
-    1: "Sunday",
-    2: "Monday",
-    3: "Tuesday",
-    4: "Wednesday",
-    5: "Thursday",
-    6: "Friday",
-    7: "Saturday",
-}
+def _create_tag_entities(coordinator, tags: S7TagMap) -> list:
+    """Create the number entities of the tags"""
+    # Watering areas
+    return [
+        HaWateringAreaStartTime(coordinator, description)
+        for description in tags.watering_areas
+    ] + [
+        HaWateringRunTime(coordinator, description, day)
+        for day in INT_TO_DAY_MAP
+        for description in tags.watering_areas
+    ]
 
 
 class HaWateringRunTime(CoordinatorEntity, NumberEntity):
@@ -81,7 +71,7 @@ class HaWateringRunTime(CoordinatorEntity, NumberEntity):
         self._db_number = description.s7datablock
 
         # Addresses in the DB
-        self._s7_run_minutes = S7Word(description.s7datablock, 16 + (day - 1) * 2)
+        self._s7_run_minutes = description.s7_run_minutes(day)
 
         # Rely on the parent class implementation for these attributes
         self._attr_name = f"{description.name} {day} {INT_TO_DAY_MAP[day]}"
@@ -115,7 +105,7 @@ class HaWateringAreaStartTime(CoordinatorEntity, NumberEntity):
         self._db_number = description.s7datablock
 
         # Addresses in the DB
-        self._s7_start_hour = S7Word(description.s7datablock, 12)
+        self._s7_start_hour = description.s7_start_hour
 
         # Rely on the parent class implementation for these attributes
         self._attr_name = description.name + " Start Hour"
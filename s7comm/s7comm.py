@@ -1,20 +1,104 @@
+from abc import ABC, abstractmethod
+import ctypes
+from dataclasses import dataclass
+from functools import lru_cache
+import re
 import string
-from typing import Dict
+import time
+from typing import Any, Dict
 
 import snap7
-
-
-class S7Addr:
+from snap7.common import check_error
+from snap7.types import Areas, S7DataItem, WordLen
+
+# Snap7 limits a multi-variable read or write to this many items per request
+MAX_MULTI_VARS = 20
+
+# Smallest PDU length a S7 CPU negotiates, used until connected
+PDU_LENGTH_MIN = 240
+
+# Multi-variable read overheads in bytes, used to fit requests into the PDU
+READ_REQUEST_HEADER = 12  # S7 header (10), function and item count (2)
+READ_REQUEST_ITEM = 12  # Variable specification of each item
+READ_RESPONSE_HEADER = 14  # S7 ack header (12), function and item count (2)
+READ_RESPONSE_ITEM = 4  # Return code, transport size and length of each item
+
+# Read plan tuning. Candidate plans pack at most this many items, and this
+# fraction of the PDU payload, into each request
+PLAN_ITEM_LIMITS = (MAX_MULTI_VARS, 8, 4)
+PLAN_PAYLOAD_FRACTIONS = (1.0, 0.5)
+PLAN_SAMPLES = 5  # Update cycles timed for each candidate before choosing one
+PLAN_SMOOTHING = 0.2  # Weight of the newest sample in the moving averages
+PLAN_DRIFT = 1.5  # Re-tune when the chosen plan gets this much slower
+PLAN_REVIEW_CYCLES = 3600  # Re-tune after this many cycles regardless
+
+# Mnemonics of the areas other than DBs, used in addresses and coordinator data keys
+AREA_MNEMONICS = {
+    Areas.MK: "M",
+    Areas.PE: "I",
+    Areas.PA: "Q",
+    Areas.TM: "T",
+    Areas.CT: "C",
+}
+MNEMONIC_AREAS = {value: key for key, value in AREA_MNEMONICS.items()}
+
+
+class S7Addr(ABC):
     type: snap7.types.WordLen
-    db: int
+    area: snap7.types.Areas = Areas.DB
+    db: int = 0
     byte: int
-    bit: int
+    bit: int = 0
+
+    # Number of bytes occupied by one of these addresses
+    size: int = 1
+
+    @property
+    def key(self) -> str:
+        """Key of the area image this address is in, ie DB10 or M"""
+        if self.area == Areas.DB:
+            return f"DB{self.db}"
+        return AREA_MNEMONICS[self.area]
+
+    @property
+    def start(self) -> int:
+        """Start of the address as snap7 expects it, bits are addressed individually"""
+        if self.type == WordLen.Bit:
+            return self.byte * 8 + self.bit
+        return self.byte
+
+    @property
+    def amount(self) -> int:
+        """Number of word length elements to transfer"""
+        return 1
+
+    def split(self, max_size: int) -> list["S7Addr"]:
+        """Split into addresses of at most max_size bytes, if possible"""
+        return [self]
+
+    @abstractmethod
+    def decode(self, data, fmt: str = None) -> Any:
+        """Decode the value of this address from data read at its start"""
+
+    @abstractmethod
+    def encode(self, value, fmt: str = None) -> bytearray:
+        """Encode a value of this address, ready to be written at its start"""
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self})"
+
+    def _prefix(self, size_letter: str) -> str:
+        """Address up to the byte, ie DB10.DBW or MW"""
+        if self.area == Areas.DB:
+            return f"DB{self.db}.DB{size_letter}"
+        return f"{AREA_MNEMONICS[self.area]}{size_letter if size_letter != 'X' else ''}"
 
 
 class S7Comm:
 
     _ip_address: string
-    _read_db_list: dict[int, dict[str, any]] = {}
+    _read_areas: dict[str, "S7Bytes"]
+    _read_data: dict[str, bytearray]
 
     rain_today: string
     rain_yday: string
@@ -24,10 +108,45 @@ class S7Comm:
         self._client = snap7.client.Client()
         self._ip_address = ip_address
         self.comms_status = False
+        self._read_areas = {}
+        self._read_data = {}
+        self._planner = S7ReadPlanner()
+        self._pdu_length = PDU_LENGTH_MIN
+        self._replan = True
 
     def register_db(self, db_number: int, start: int, size: int):
-        db_details = {"start": start, "size": size, "data": None}
-        self._read_db_list[db_number] = db_details
+        self.register_area(Areas.DB, start, size, db_number)
+
+    def register_area(self, area: Areas, start: int, size: int, db_number: int = 0):
+        """Register an area to be read each update. For timers and counters
+        start is the first number and size the count of them, otherwise bytes"""
+        element_size = 2 if area in (Areas.TM, Areas.CT) else 1
+        s7addr = S7Bytes(db_number, start, size * element_size, area)
+        if str(self._read_areas.get(s7addr.key)) == str(s7addr):
+            return
+        self._read_areas[s7addr.key] = s7addr
+        self._read_data.setdefault(s7addr.key, None)
+        self._replan = True
+
+    def unregister_area(self, key: str):
+        """Stop reading the area with the given key, ie DB45 or M"""
+        if self._read_areas.pop(key, None) is None:
+            return
+        self._read_data.pop(key, None)
+        self._replan = True
+
+    def get_read_areas(self) -> dict[str, "S7Bytes"]:
+        return self._read_areas
+
+    def set_read_areas(self, read_areas: dict[str, "S7Bytes"]):
+        """Replace the registered areas, keeping the images of unchanged areas"""
+        if {k: str(v) for k, v in read_areas.items()} == {
+            k: str(v) for k, v in self._read_areas.items()
+        }:
+            return
+        self._read_areas = dict(read_areas)
+        self._read_data = {key: self._read_data.get(key) for key in read_areas}
+        self._replan = True
 
     def write_int(self, s7addr: S7Addr, int_value: int):
 
@@ -42,21 +161,102 @@ class S7Comm:
             return None
 
     def update_dbs(self) -> bool:
+        """Read all registered areas, batched into multi-variable requests"""
 
         if not self._connect():
             return None
 
+        if self._replan:
+            self._planner.set_areas(list(self._read_areas.values()), self._pdu_length)
+            self._replan = False
+
+        images = {
+            key: bytearray(s7addr.size) for key, s7addr in self._read_areas.items()
+        }
+        plan = self._planner.next_plan()
+        timings = []
+        started = time.perf_counter()
         try:
-            for db_number in self._read_db_list.keys():
-                start = self._read_db_list[db_number]["start"]
-                size = self._read_db_list[db_number]["size"]
-                data = self._client.db_read(db_number, start, size)
-                self._read_db_list[db_number]["data"] = data
+            for request in plan.requests:
+                request_started = time.perf_counter()
+                results = self._read_request(request)
+                timings.append(
+                    (
+                        sum(s7addr.size for s7addr in request),
+                        time.perf_counter() - request_started,
+                    )
+                )
+                for s7addr, data in zip(request, results):
+                    area = self._read_areas[s7addr.key]
+                    offset = (s7addr.byte - area.byte) * area.element_size
+                    if data is None or images[s7addr.key] is None:
+                        images[s7addr.key] = None
+                    else:
+                        images[s7addr.key][offset : offset + s7addr.size] = data
         except:
             return None
 
-    def get_db_data(self):
-        return self._read_db_list
+        self._planner.record(plan, time.perf_counter() - started, timings)
+        self._read_data.update(images)
+        return True
+
+    def read_multi(self, s7addrs: list[S7Addr]) -> list[bytearray]:
+        """Read each address, batched into as few multi-variable requests as
+        fit in a PDU. Addresses the PLC rejected are returned as None"""
+
+        if not self._connect():
+            return None
+
+        results = []
+        try:
+            for request in plan_reads(s7addrs, self._pdu_length):
+                results.extend(self._read_request(request))
+        except:
+            return None
+
+        return results
+
+    def _read_request(self, s7addrs: list[S7Addr]) -> list[bytearray]:
+        """Read the addresses in one multi-variable request"""
+        items, buffers = _s7_data_items(s7addrs)
+        self._client.read_multi_vars(items)
+        return [
+            bytearray(buffer) if item.Result == 0 else None
+            for item, buffer in zip(items, buffers)
+        ]
+
+    def write_multi(self, values: list[tuple[S7Addr, bytearray]]) -> bool:
+        """Write each (address, data) pair, batched into as few multi-variable
+        requests as snap7 allows"""
+
+        if not self._connect():
+            return False
+
+        try:
+            for stt in range(0, len(values), MAX_MULTI_VARS):
+                chunk = values[stt : stt + MAX_MULTI_VARS]
+                items, buffers = _s7_data_items(
+                    [s7addr for s7addr, _ in chunk], [data for _, data in chunk]
+                )
+                # python-snap7 1.1 has no wrapper for Cli_WriteMultiVars
+                result = self._client._library.Cli_WriteMultiVars(
+                    self._client._pointer, ctypes.byref(items), ctypes.c_int32(len(items))
+                )
+                check_error(result, context="client")
+                if any(item.Result != 0 for item in items):
+                    return False
+        except:
+            return False
+
+        return True
+
+    def get_db_data(self) -> dict[str, bytearray]:
+        """Latest image of each registered area, keyed as S7Addr.key"""
+        return self._read_data
+
+    def get_read_plan(self) -> dict[str, Any]:
+        """The read plan in use and the timings it was chosen by"""
+        return self._planner.as_dict()
 
     def get_cpu_state(self) -> str:
         if not self._connect():
@@ -75,6 +275,10 @@ class S7Comm:
         if not self._client.get_connected():
             try:
                 self._client.connect(self._ip_address, 0, 1, 102)
+                pdu_length = self._client.get_pdu_length()
+                if pdu_length != self._pdu_length:
+                    self._pdu_length = pdu_length
+                    self._replan = True
             except:
                 pass
 
@@ -89,14 +293,17 @@ class S7Comm:
 
 
 class S7Bool(S7Addr):
-    def __init__(self, db: int, byte: int, bit: int) -> None:
+    size = 1
+
+    def __init__(self, db: int, byte: int, bit: int, area: Areas = Areas.DB) -> None:
         self.type = snap7.types.WordLen.Bit
+        self.area = area
         self.db = db
         self.byte = byte
         self.bit = bit
 
     def __str__(self) -> str:
-        return f"DB{self.db}.DBX{self.byte}.{self.bit}"
+        return f"{self._prefix('X')}{self.byte}.{self.bit}"
 
     def get_bool(self, db_data) -> bool:
         try:
@@ -104,15 +311,25 @@ class S7Bool(S7Addr):
         except:
             return None
 
+    def decode(self, data, fmt: str = None) -> bool:
+        # Snap7 returns a single bit as the lowest bit of a byte
+        return bool(snap7.util.get_bool(data, 0, 0))
+
+    def encode(self, value, fmt: str = None) -> bytearray:
+        return bytearray([1 if value else 0])
+
 
 class S7DWord(S7Addr):
-    def __init__(self, db: int, byte: int) -> None:
+    size = 4
+
+    def __init__(self, db: int, byte: int, area: Areas = Areas.DB) -> None:
         self.type = snap7.types.WordLen.DWord
+        self.area = area
         self.db = db
         self.byte = byte
 
     def __str__(self) -> str:
-        return f"DB{self.db}.DBD{self.byte}"
+        return f"{self._prefix('D')}{self.byte}"
 
     def get_real(self, real_format, db_data) -> float:
         try:
@@ -132,15 +349,35 @@ class S7DWord(S7Addr):
         except:
             return None
 
+    def decode(self, data, fmt: str = None) -> Any:
+        if fmt == "dint":
+            return snap7.util.get_dint(data, 0)
+        if fmt == "dword":
+            return snap7.util.get_dword(data, 0)
+        return snap7.util.get_real(data, 0)
+
+    def encode(self, value, fmt: str = None) -> bytearray:
+        data = bytearray(self.size)
+        if fmt == "dint":
+            snap7.util.set_dint(data, 0, int(value))
+        elif fmt == "dword":
+            snap7.util.set_dword(data, 0, int(value))
+        else:
+            snap7.util.set_real(data, 0, float(value))
+        return data
+
 
 class S7Word(S7Addr):
-    def __init__(self, db: int, byte: int) -> None:
+    size = 2
+
+    def __init__(self, db: int, byte: int, area: Areas = Areas.DB) -> None:
         self.type = snap7.types.WordLen.Word
+        self.area = area
         self.db = db
         self.byte = byte
 
     def __str__(self) -> str:
-        return f"DB{self.db}.DBW{self.byte}"
+        return f"{self._prefix('W')}{self.byte}"
 
     def get_int(self, db_data) -> int:
         try:
@@ -154,6 +391,148 @@ class S7Word(S7Addr):
         except:
             return None
 
+    def decode(self, data, fmt: str = None) -> int:
+        if fmt == "word":
+            return snap7.util.get_word(data, 0)
+        return snap7.util.get_int(data, 0)
+
+    def encode(self, value, fmt: str = None) -> bytearray:
+        data = bytearray(self.size)
+        if fmt == "word":
+            snap7.util.set_word(data, 0, int(value))
+        else:
+            snap7.util.set_int(data, 0, int(value))
+        return data
+
+
+class S7Bytes(S7Addr):
+    """A contiguous range of bytes, written or read as one block. For the timer
+    and counter areas byte is the first number and each one is two bytes"""
+
+    def __init__(self, db: int, byte: int, size: int, area: Areas = Areas.DB) -> None:
+        self.type = _AREA_WORD_LENS.get(area, snap7.types.WordLen.Byte)
+        self.area = area
+        self.db = db
+        self.byte = byte
+        self.size = size
+
+    def __str__(self) -> str:
+        if self.type != snap7.types.WordLen.Byte:
+            return f"P#{self.key}{self.byte} WORD {self.amount}"
+        return f"P#{self._prefix('X')}{self.byte}.0 BYTE {self.size}"
+
+    @property
+    def element_size(self) -> int:
+        return 1 if self.type == snap7.types.WordLen.Byte else 2
+
+    @property
+    def amount(self) -> int:
+        return self.size // self.element_size
+
+    def split(self, max_size: int) -> list[S7Addr]:
+        step = max_size - max_size % self.element_size
+        return [
+            S7Bytes(
+                self.db,
+                self.byte + offset // self.element_size,
+                min(step, self.size - offset),
+                self.area,
+            )
+            for offset in range(0, self.size, step)
+        ]
+
+    def get_bytes(self, db_data) -> bytearray:
+        try:
+            data = bytearray(db_data[self.byte : self.byte + self.size])
+        except:
+            return None
+        return data if len(data) == self.size else None
+
+    def decode(self, data, fmt: str = None) -> bytearray:
+        return bytearray(data)
+
+    def encode(self, value, fmt: str = None) -> bytearray:
+        return bytearray(value)
+
+
+class S7Timer(S7Addr):
+    """A S7 timer, the value is its remaining time in milliseconds"""
+
+    size = 2
+
+    # S5TIME time bases, in milliseconds
+    TIME_BASES = (10, 100, 1000, 10000)
+
+    def __init__(self, number: int) -> None:
+        self.type = snap7.types.WordLen.Timer
+        self.area = Areas.TM
+        self.byte = number
+
+    def __str__(self) -> str:
+        return f"T{self.byte}"
+
+    def get_timer(self, tm_data) -> int:
+        try:
+            return self.decode(tm_data[self.byte * 2 : self.byte * 2 + 2])
+        except:
+            return None
+
+    def decode(self, data, fmt: str = None) -> int:
+        word = snap7.util.get_word(bytearray(data), 0)
+        return _from_bcd(word & 0x0FFF) * self.TIME_BASES[(word >> 12) & 0x03]
+
+    def encode(self, value, fmt: str = None) -> bytearray:
+        # Use the finest time base that can hold the value in three BCD digits
+        value = int(value)
+        for base_idx, base in enumerate(self.TIME_BASES):
+            if value // base <= 999 or base_idx == len(self.TIME_BASES) - 1:
+                break
+        data = bytearray(self.size)
+        snap7.util.set_word(data, 0, (base_idx << 12) | _to_bcd(min(value // base, 999)))
+        return data
+
+
+class S7Counter(S7Addr):
+    """A S7 counter, the value is its count 0-999"""
+
+    size = 2
+
+    def __init__(self, number: int) -> None:
+        self.type = snap7.types.WordLen.Counter
+        self.area = Areas.CT
+        self.byte = number
+
+    def __str__(self) -> str:
+        return f"C{self.byte}"
+
+    def get_counter(self, ct_data) -> int:
+        try:
+            return self.decode(ct_data[self.byte * 2 : self.byte * 2 + 2])
+        except:
+            return None
+
+    def decode(self, data, fmt: str = None) -> int:
+        return _from_bcd(snap7.util.get_word(bytearray(data), 0) & 0x0FFF)
+
+    def encode(self, value, fmt: str = None) -> bytearray:
+        data = bytearray(self.size)
+        snap7.util.set_word(data, 0, _to_bcd(max(0, min(int(value), 999))))
+        return data
+
+
+_AREA_WORD_LENS = {
+    Areas.TM: snap7.types.WordLen.Timer,
+    Areas.CT: snap7.types.WordLen.Counter,
+}
+
+
+def _from_bcd(value: int) -> int:
+    return (value >> 8 & 0x0F) * 100 + (value >> 4 & 0x0F) * 10 + (value & 0x0F)
+
+
+def _to_bcd(value: int) -> int:
+    return (value // 100 % 10) << 8 | (value // 10 % 10) << 4 | value % 10
+
 
 def s7_real(real_format, data, byte):
     return float(real_format.format(snap7.util.get_real(data, byte)))
@@ -161,3 +540,226 @@ def s7_real(real_format, data, byte):
 
 def s7_bool(data, byte, bit):
     return bool(snap7.util.get_bool(data, byte, bit))
+
+
+# Same notation as the S7Addr __str__ methods, ie DB10.DBX14.3, DB28.DBW12,
+# DB40.DBD30, M14.3, IW64, QD8, T5 or C3
+_S7_ADDR_RE = re.compile(
+    r"^(?:DB(?P<db>\d+)\.DB|(?P<area>[MIQ]))"
+    r"(?:X?(?P<xbyte>\d+)\.(?P<bit>[0-7])|(?P<type>[WD])(?P<byte>\d+))$"
+)
+_S7_TIMER_COUNTER_RE = re.compile(r"^(?P<area>[TC])(?P<number>\d+)$")
+
+
+@lru_cache(maxsize=512)
+def parse_s7addr(address: str) -> S7Addr:
+    """Parse an address string into its S7Addr, raising ValueError if invalid"""
+    address = address.strip().upper()
+
+    match = _S7_TIMER_COUNTER_RE.match(address)
+    if match is not None:
+        if match["area"] == "T":
+            return S7Timer(int(match["number"]))
+        return S7Counter(int(match["number"]))
+
+    match = _S7_ADDR_RE.match(address)
+    if match is None or (match["area"] is None and match["db"] is None):
+        raise ValueError(f"Invalid S7 address '{address}'")
+
+    db = int(match["db"] or 0)
+    area = MNEMONIC_AREAS[match["area"]] if match["area"] else Areas.DB
+    if match["xbyte"] is not None:
+        return S7Bool(db, int(match["xbyte"]), int(match["bit"]), area)
+    if match["type"] == "W":
+        return S7Word(db, int(match["byte"]), area)
+    return S7DWord(db, int(match["byte"]), area)
+
+
+def plan_reads(
+    s7addrs: list[S7Addr],
+    pdu_length: int = PDU_LENGTH_MIN,
+    max_items: int = MAX_MULTI_VARS,
+    payload_fraction: float = 1.0,
+) -> list[list[S7Addr]]:
+    """Group the addresses into multi-variable read requests that fit in the
+    PDU, splitting ranges too large for a single request into several items.
+    Requests can be limited to fewer items or a fraction of the payload"""
+    max_items = min(
+        max_items,
+        MAX_MULTI_VARS,
+        (pdu_length - READ_REQUEST_HEADER) // READ_REQUEST_ITEM,
+    )
+    budget = max(
+        int((pdu_length - READ_RESPONSE_HEADER) * payload_fraction),
+        READ_RESPONSE_ITEM + 2,
+    )
+
+    requests = []
+    request = []
+    used = 0
+    for s7addr in s7addrs:
+        for chunk in s7addr.split(budget - READ_RESPONSE_ITEM):
+            # Odd length items are padded to a word in the response
+            cost = READ_RESPONSE_ITEM + chunk.size + chunk.size % 2
+            if request and (len(request) >= max_items or used + cost > budget):
+                requests.append(request)
+                request = []
+                used = 0
+            request.append(chunk)
+            used += cost
+    if request:
+        requests.append(request)
+
+    return requests
+
+
+@dataclass
+class S7ReadPlan:
+    """A candidate grouping of the read areas into requests, with its timing"""
+
+    max_items: int
+    payload_fraction: float
+    requests: list[list[S7Addr]]
+    samples: int = 0
+    cycle_time: float = None
+
+    def add_sample(self, cycle_time: float):
+        self.samples += 1
+        self.cycle_time = _smooth(self.cycle_time, cycle_time)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "max_items": self.max_items,
+            "payload_fraction": self.payload_fraction,
+            "requests": len(self.requests),
+            "items": sum(len(request) for request in self.requests),
+            "samples": self.samples,
+            "cycle_time_ms": _ms(self.cycle_time),
+        }
+
+
+class S7ReadPlanner:
+    """Choose how the read areas are grouped into multi-variable requests.
+
+    Candidate plans are built for the negotiated PDU length, packing more or
+    fewer items and bytes into each request. Each is timed over a few update
+    cycles and the fastest is then used, until it slows by PLAN_DRIFT or
+    PLAN_REVIEW_CYCLES have passed, when all the candidates are timed again.
+    """
+
+    def __init__(self) -> None:
+        self.pdu_length = PDU_LENGTH_MIN
+        self._plans: list[S7ReadPlan] = []
+        self._chosen: S7ReadPlan = None
+        self._chosen_time: float = None
+        self._cycles = 0
+        self._tunings = 0
+        self._request_time: float = None
+        self._throughput: float = None
+
+    def set_areas(self, s7addrs: list[S7Addr], pdu_length: int):
+        """Build the candidate plans for the areas, identical plans only once"""
+        self.pdu_length = pdu_length
+        plans = {}
+        for max_items in PLAN_ITEM_LIMITS:
+            for payload_fraction in PLAN_PAYLOAD_FRACTIONS:
+                requests = plan_reads(s7addrs, pdu_length, max_items, payload_fraction)
+                signature = tuple(tuple(map(str, request)) for request in requests)
+                plans.setdefault(
+                    signature, S7ReadPlan(max_items, payload_fraction, requests)
+                )
+        self._plans = list(plans.values())
+        self._review()
+
+    def next_plan(self) -> S7ReadPlan:
+        """Plan to read with, the least timed candidate while tuning"""
+        if self._chosen is not None:
+            return self._chosen
+        return min(self._plans, key=lambda plan: plan.samples)
+
+    def record(
+        self, plan: S7ReadPlan, cycle_time: float, timings: list[tuple[int, float]]
+    ):
+        """Record the time of a successful update cycle and of each of its
+        requests, as the (payload bytes, seconds) they took"""
+        plan.add_sample(cycle_time)
+        for size, seconds in timings:
+            self._request_time = _smooth(self._request_time, seconds)
+            if seconds > 0:
+                self._throughput = _smooth(self._throughput, size / seconds)
+
+        if self._chosen is None:
+            if all(plan.samples >= PLAN_SAMPLES for plan in self._plans):
+                self._chosen = min(self._plans, key=lambda plan: plan.cycle_time)
+                self._chosen_time = self._chosen.cycle_time
+                self._cycles = 0
+            return
+
+        # Network or PLC load changed, or just time to check
+        self._cycles += 1
+        if (
+            self._cycles >= PLAN_REVIEW_CYCLES
+            or plan.cycle_time > self._chosen_time * PLAN_DRIFT
+        ):
+            self._review()
+
+    def as_dict(self) -> dict[str, Any]:
+        plan = self.next_plan() if self._plans else None
+        return {
+            "pdu_length": self.pdu_length,
+            "state": "tuning" if self._chosen is None else "tuned",
+            "tunings": self._tunings,
+            "cycles_since_tuned": self._cycles if self._chosen is not None else 0,
+            "request_time_ms": _ms(self._request_time),
+            "throughput_bytes_per_s": (
+                None if self._throughput is None else round(self._throughput)
+            ),
+            "candidates": [
+                {**candidate.as_dict(), "chosen": candidate is self._chosen}
+                for candidate in self._plans
+            ],
+            "plan": [] if plan is None else [
+                [str(s7addr) for s7addr in request] for request in plan.requests
+            ],
+        }
+
+    def _review(self):
+        """Time all the candidates again"""
+        for plan in self._plans:
+            plan.samples = 0
+            plan.cycle_time = None
+        self._chosen = None
+        self._chosen_time = None
+        self._cycles = 0
+        self._tunings += 1
+
+
+def _smooth(average: float, value: float) -> float:
+    """Exponential moving average, starting at the first value"""
+    if average is None:
+        return value
+    return average + PLAN_SMOOTHING * (value - average)
+
+
+def _ms(seconds: float) -> float:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+def _s7_data_items(s7addrs: list[S7Addr], data: list[bytearray] = None):
+    """Create the snap7 data items for the addresses, along with the buffers
+    they point to. The buffers must be kept referenced until the request is done"""
+    items = (S7DataItem * len(s7addrs))()
+    buffers = []
+    for idx, s7addr in enumerate(s7addrs):
+        if data is None:
+            buffer = (ctypes.c_uint8 * s7addr.size)()
+        else:
+            buffer = (ctypes.c_uint8 * s7addr.size).from_buffer_copy(data[idx])
+        items[idx].Area = s7addr.area.value
+        items[idx].WordLen = s7addr.type.value
+        items[idx].DBNumber = s7addr.db
+        items[idx].Start = s7addr.start
+        items[idx].Amount = s7addr.amount
+        items[idx].pData = ctypes.cast(buffer, ctypes.POINTER(ctypes.c_uint8))
+        buffers.append(buffer)
+    return items, buffers
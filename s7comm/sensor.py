@@ -5,9 +5,14 @@ from collections.abc import MutableMapping
 import logging
 from typing import Any, cast
 
-from homeassistant.components.sensor import SensorEntity, SensorEntityDescription
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_ATTRIBUTION
+from homeassistant.const import ATTR_ATTRIBUTION, Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
@@ -19,8 +24,15 @@ from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
 )
 
-from .const import DOMAIN, SENSOR_REAL_ENTITIES, S7SensorEntityDescription
-from .s7comm import S7Comm, s7_real
+from .const import (
+    DEVICE_STATUS_OPTIONS,
+    DOMAIN,
+    HAGenericEntityDescription,
+    S7DeviceLayout,
+    S7SensorEntityDescription,
+)
+from .s7comm import S7Bool, S7Comm, S7Word, s7_real
+from .tags import S7TagMap
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,24 +46,39 @@ async def async_setup_entry(
     _LOGGER.debug("Setting up Step7 Sensor PLC entities...")
     coordinator: DataUpdateCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    coordinator.s7comm.register_db(40, 0, 54)  # Rain Counter
-    coordinator.s7comm.register_db(202, 0, 120)  # Tank Level
-    coordinator.s7comm.register_db(60, 0, 120)  # Camper Trailer Batt Voltage
-    coordinator.s7comm.register_db(22, 0, 120)  # Outside temp
-    coordinator.s7comm.register_db(32, 0, 16)  # Outside temp ROC
-    coordinator.s7comm.register_db(19, 0, 46)  # Tank Pump Calculated Flow
-
     # Now we have told the coorindator about what DB's to load
     # wait until the next update before we start adding entities
     # this will mean DB data is available from the time the entities
     # are loaded into HASS
+    coordinator.register_dbs()
     await coordinator.async_config_entry_first_refresh()
 
-    async_add_entities(
-        [Step7Real(coordinator, description) for description in SENSOR_REAL_ENTITIES]
+    coordinator.async_add_tag_entities(
+        Platform.SENSOR, async_add_entities, _create_tag_entities
     )
 
 
+def _create_tag_entities(coordinator, tags: S7TagMap) -> list:
+    """Create the sensor entities of the tags"""
+    entities = [Step7Real(coordinator, description) for description in tags.sensors]
+
+    # Run times and status of covers and devices
+    for layout, descriptions in (
+        (tags.cover_layout, tags.covers),
+        (tags.device2_layout, tags.device2s),
+    ):
+        entities.extend(
+            entity
+            for description in descriptions
+            for entity in (
+                S7DeviceRunTime(coordinator, description, layout, True),
+                S7DeviceRunTime(coordinator, description, layout, False),
+                S7DeviceStatus(coordinator, description, layout),
+            )
+        )
+    return entities
+
+
 class Step7Real(CoordinatorEntity, SensorEntity):
     """Implementation of a step7 real sensor."""
 
@@ -84,3 +111,116 @@ class Step7Real(CoordinatorEntity, SensorEntity):
         db_data = self.coordinator.data[idx]
         value = s7_real("{0:.1f}", db_data, self._offset)
         return cast(StateType, value)
+
+
+class S7DeviceRunTime(CoordinatorEntity, SensorEntity):
+    """Minutes a cover was open or a device was on today or yesterday."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = "min"
+    _attr_icon = "mdi:timer-outline"
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        description: HAGenericEntityDescription,
+        layout: S7DeviceLayout,
+        today: bool,
+    ) -> None:
+        """Initialize the run time sensor."""
+        super().__init__(coordinator)
+        db_number = description.s7datablock
+        day = "Today" if today else "Yesterday"
+        if today:
+            self._s7_minutes = S7Word(db_number, layout.on_today)
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        else:
+            self._s7_minutes = S7Word(db_number, layout.on_yesterday)
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+
+        # Rely on the parent class implementation for these attributes
+        self._attr_name = f"{description.name} Time {layout.on_name} {day}"
+        self._attr_unique_id = f"DB{db_number}_time_{day.lower()}"
+        self._attr_device_info = coordinator.get_device()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state when the minute counter changes."""
+        value = self.coordinator.get_int(self._s7_minutes)
+        if value == self._attr_native_value:
+            return
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Read the initial value when added."""
+        await super().async_added_to_hass()
+        self._attr_native_value = self.coordinator.get_int(self._s7_minutes)
+
+
+class S7DeviceStatus(CoordinatorEntity, SensorEntity):
+    """Control status of a cover or device, with its active interlocks."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = DEVICE_STATUS_OPTIONS
+    _attr_icon = "mdi:list-status"
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        description: HAGenericEntityDescription,
+        layout: S7DeviceLayout,
+    ) -> None:
+        """Initialize the status sensor."""
+        super().__init__(coordinator)
+        db_number = description.s7datablock
+        self._s7_interlocks = description.s7_interlocks
+        self._s7_available = S7Bool(db_number, *layout.available)
+        self._s7_is_automatic = S7Bool(db_number, *layout.automatic)
+        self._s7_disabled = S7Bool(db_number, *layout.disabled)
+
+        # Rely on the parent class implementation for these attributes
+        self._attr_name = f"{description.name} Status"
+        self._attr_unique_id = f"DB{db_number}_status"
+        self._attr_device_info = coordinator.get_device()
+        self._attr_extra_state_attributes = {"Interlocks": []}
+
+    def _update_status(self) -> bool:
+        """Update the status and interlocks, returning True if either changed"""
+        available = self.coordinator.get_bool(self._s7_available)
+        auto = self.coordinator.get_bool(self._s7_is_automatic)
+        disabled = self.coordinator.get_bool(self._s7_disabled)
+        interlocks = [
+            interlock.name
+            for interlock in self.coordinator.get_interlocks(self._s7_interlocks)
+        ]
+
+        status = "None"
+        if available:
+            status = "User Control"
+        if available and auto:
+            status = "Automatic"
+        if disabled:
+            status = "Disabled"
+        if interlocks:
+            status = "Interlocked"
+
+        if (
+            status == self._attr_native_value
+            and interlocks == self._attr_extra_state_attributes["Interlocks"]
+        ):
+            return False
+        self._attr_native_value = status
+        self._attr_extra_state_attributes = {"Interlocks": interlocks}
+        return True
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state when the status or interlocks change."""
+        if self._update_status():
+            self.async_write_ha_state()
+
+    async def async_added_to_hass(self) -> None:
+        """Read the initial status when added."""
+        await super().async_added_to_hass()
+        self._update_status()
@@ -0,0 +1,203 @@
+"""Services for the Step7 PLC integration."""
+from __future__ import annotations
+
+import snap7
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+
+from .const import (
+    DOMAIN,
+    INT_TO_DAY_MAP,
+    MAX_RUN_MINS,
+    MAX_START_HOURS,
+    MIN_RUN_MINS,
+    MIN_START_HOURS,
+    HAWateringAreaDescription,
+)
+from .s7comm import parse_s7addr
+
+SERVICE_READ = "read"
+SERVICE_WRITE = "write"
+SERVICE_SET_WATERING_SCHEDULE = "set_watering_schedule"
+SERVICE_RELOAD_TAGS = "reload_tags"
+
+ATTR_ADDRESSES = "addresses"
+ATTR_AREA = "area"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_FORMAT = "format"
+ATTR_SCHEDULES = "schedules"
+ATTR_START_HOUR = "start_hour"
+ATTR_VALUES = "values"
+
+# Word addresses are int or word, double word addresses are real, dint or dword
+FORMATS = ["int", "word", "real", "dint", "dword"]
+
+
+def s7address(value) -> str:
+    """Validate an S7 address string, ie DB10.DBX14.3"""
+    value = cv.string(value)
+    try:
+        parse_s7addr(value)
+    except ValueError as err:
+        raise vol.Invalid(str(err)) from err
+    return value
+
+
+READ_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ADDRESSES): vol.All(cv.ensure_list, [s7address]),
+        vol.Optional(ATTR_FORMAT): vol.In(FORMATS),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+WRITE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_VALUES): {s7address: vol.Any(bool, int, float)},
+        vol.Optional(ATTR_FORMAT): vol.In(FORMATS),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+RUN_MINUTES = vol.All(vol.Coerce(int), vol.Range(MIN_RUN_MINS, MAX_RUN_MINS))
+
+SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_AREA): cv.string,
+        vol.Optional(ATTR_START_HOUR): vol.All(
+            vol.Coerce(int), vol.Range(MIN_START_HOURS, MAX_START_HOURS)
+        ),
+        **{vol.Optional(day.lower()): RUN_MINUTES for day in INT_TO_DAY_MAP.values()},
+    }
+)
+
+SET_WATERING_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_SCHEDULES): vol.All(cv.ensure_list, [SCHEDULE_SCHEMA]),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+RELOAD_TAGS_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+
+def _get_coordinator(hass: HomeAssistant, call: ServiceCall):
+    """Coordinator of the given config entry, or the only one if none given"""
+    coordinators = hass.data.get(DOMAIN, {})
+    entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    if entry_id is None and coordinators:
+        return next(iter(coordinators.values()))
+    if entry_id not in coordinators:
+        raise HomeAssistantError(f"Step7 PLC config entry {entry_id} not loaded")
+    return coordinators[entry_id]
+
+
+def _encode_schedule(
+    coordinator, description: HAWateringAreaDescription, schedule: dict
+) -> bytearray:
+    """Encode a watering schedule as its block of words, any values not given
+    are kept as currently in the PLC"""
+    s7addr = description.s7_schedule
+    data = s7addr.get_bytes(coordinator.data.get(s7addr.key))
+    if data is None:
+        raise HomeAssistantError(f"No PLC data for {description.name} yet")
+
+    if ATTR_START_HOUR in schedule:
+        snap7.util.set_int(data, 0, schedule[ATTR_START_HOUR])
+    for day, day_name in INT_TO_DAY_MAP.items():
+        if day_name.lower() in schedule:
+            snap7.util.set_int(data, 2 + day * 2, schedule[day_name.lower()])
+    return data
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Step7 PLC services, once for all config entries."""
+    if hass.services.has_service(DOMAIN, SERVICE_READ):
+        return
+
+    async def async_read(call: ServiceCall) -> ServiceResponse:
+        """Read all the addresses in one batched request."""
+        coordinator = _get_coordinator(hass, call)
+        addresses = call.data[ATTR_ADDRESSES]
+        values = await coordinator.read_values(
+            [parse_s7addr(address) for address in addresses],
+            call.data.get(ATTR_FORMAT),
+        )
+        return {ATTR_VALUES: dict(zip(addresses, values))}
+
+    async def async_write(call: ServiceCall) -> None:
+        """Write all the values in one batched request."""
+        coordinator = _get_coordinator(hass, call)
+        await coordinator.write_values(
+            [
+                (parse_s7addr(address), value)
+                for address, value in call.data[ATTR_VALUES].items()
+            ],
+            call.data.get(ATTR_FORMAT),
+        )
+        await coordinator.async_request_refresh()
+
+    async def async_set_watering_schedule(call: ServiceCall) -> None:
+        """Write the schedule of each area as one block, in one batched request."""
+        coordinator = _get_coordinator(hass, call)
+        # Areas are looked up at call time, as the tags can be reloaded
+        areas = {desc.key: desc for desc in coordinator.tags.watering_areas}
+        blocks = {}
+        for schedule in call.data[ATTR_SCHEDULES]:
+            if (description := areas.get(schedule[ATTR_AREA])) is None:
+                raise HomeAssistantError(
+                    f"Unknown watering area {schedule[ATTR_AREA]}"
+                )
+            blocks[description.key] = (
+                description.s7_schedule,
+                _encode_schedule(coordinator, description, schedule),
+            )
+        await coordinator.write_blocks(list(blocks.values()))
+
+    async def async_reload_tags(call: ServiceCall) -> None:
+        """Reload the tags of const.py, keeping the PLC connection."""
+        if ATTR_CONFIG_ENTRY_ID in call.data:
+            coordinators = [_get_coordinator(hass, call)]
+        else:
+            coordinators = list(hass.data.get(DOMAIN, {}).values())
+        for coordinator in coordinators:
+            await coordinator.async_reload_tags()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_READ,
+        async_read,
+        schema=READ_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_WRITE, async_write, schema=WRITE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_WATERING_SCHEDULE,
+        async_set_watering_schedule,
+        schema=SET_WATERING_SCHEDULE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RELOAD_TAGS, async_reload_tags, schema=RELOAD_TAGS_SCHEMA
+    )
+
+
+@callback
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the Step7 PLC services when the last config entry is unloaded."""
+    hass.services.async_remove(DOMAIN, SERVICE_READ)
+    hass.services.async_remove(DOMAIN, SERVICE_WRITE)
+    hass.services.async_remove(DOMAIN, SERVICE_SET_WATERING_SCHEDULE)
+    hass.services.async_remove(DOMAIN, SERVICE_RELOAD_TAGS)
@@ -9,7 +9,8 @@ from homeassistant.components.switch import (
 )
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
@@ -18,13 +19,11 @@ from homeassistant.helpers.update_coordinator import (
 
 from .const import (
     DOMAIN,
-    HA_COVER_ENTITIES,
-    HA_DEVICE2_ENTITIES,
-    HA_WATERING_AREAS,
     HAGenericEntityDescription,
     HAWateringAreaDescription,
 )
 from .s7comm import S7Bool, S7Comm, S7DWord, S7Word
+from .tags import S7TagMap
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -45,17 +44,24 @@ async def async_setup_entry(
     coordinator.register_dbs()
     await coordinator.async_config_entry_first_refresh()
 
+    coordinator.async_add_tag_entities(
+        Platform.SWITCH, async_add_entities, _create_tag_entities
+    )
+
+
+def _create_tag_entities(coordinator, tags: S7TagMap) -> list:
+    """Create the switch entities of the tags"""
+    entities = []
+
     # Covers
-    for description in HA_COVER_ENTITIES:
+    for description in tags.covers:
         if description.disable_switch:
-            async_add_entities(
-                [HaGenericDisableSwitch(coordinator, description, 14, 5, 16)]
-            )
+            entities.append(HaGenericDisableSwitch(coordinator, description, 14, 5, 16))
 
     # Device2s
-    for description in HA_DEVICE2_ENTITIES:
+    for description in tags.device2s:
         if description.disable_switch:
-            async_add_entities(
+            entities.extend(
                 [
                     HaGenericDisableSwitch(coordinator, description, 10, 3, 12),
                     S7HaDevice2(coordinator, description),
@@ -63,12 +69,11 @@ async def async_setup_entry(
             )
 
     # Watering areas
-    async_add_entities(
-        [
-            HaWateringAreaEnableSwitch(coordinator, description)
-            for description in HA_WATERING_AREAS
-        ]
+    entities.extend(
+        HaWateringAreaEnableSwitch(coordinator, description)
+        for description in tags.watering_areas
     )
+    return entities
 
 
 class HaGenericDisableSwitch(CoordinatorEntity, SwitchEntity):
@@ -181,7 +186,7 @@ class S7HaDevice2(CoordinatorEntity, SwitchEntity):
         self._db_number = description.s7datablock
 
         # Addresses in the DB
-        self._s7_interlocks = S7Word(description.s7datablock, 2)
+        self._s7_interlocks = description.s7_interlocks
         self._s7_available = S7Bool(description.s7datablock, 8, 2)
         self._s7_auto_available = S7Bool(description.s7datablock, 8, 3)
         self._s7_is_automatic = S7Bool(description.s7datablock, 10, 0)
@@ -189,8 +194,6 @@ class S7HaDevice2(CoordinatorEntity, SwitchEntity):
         self._s7_fault = S7Bool(description.s7datablock, 10, 2)
         self._s7_disabled = S7Bool(description.s7datablock, 10, 3)
         self._s7_command = S7Word(description.s7datablock, 12)
-        self._s7_on_tday = S7Word(description.s7datablock, 14)
-        self._s7_on_yday = S7Word(description.s7datablock, 16)
 
         # Rely on the parent class implementation for these attributes
         self._attr_name = description.name
@@ -198,35 +201,21 @@ class S7HaDevice2(CoordinatorEntity, SwitchEntity):
         self._attr_device_class = description.device_class
         self._attr_unique_id = f"DB{self._db_number}_device2"
         self._attr_device_info = coordinator.get_device()
-        self._attr_extra_state_attributes = {}
-
-    def update_time_attrs(self):
-        """Update the on today and yday attributes"""
-        self._attr_extra_state_attributes[
-            "Time On Today"
-        ] = f"{self.coordinator.get_int(self._s7_on_tday)} min"
-        self._attr_extra_state_attributes[
-            "Time On YDay"
-        ] = f"{self.coordinator.get_int(self._s7_on_yday)} min"
-
-        disabled = self.coordinator.get_bool(self._s7_disabled)
-        available = self.coordinator.get_bool(self._s7_available)
-        auto = self.coordinator.get_bool(self._s7_is_automatic)
-        interlocked = self.coordinator.get_int(self._s7_interlocks) != 0
-        self._attr_extra_state_attributes["Status"] = "None"
-        if available:
-            self._attr_extra_state_attributes["Status"] = "User Control"
-        if available and auto:
-            self._attr_extra_state_attributes["Status"] = "Automatic"
-        if disabled:
-            self._attr_extra_state_attributes["Status"] = "Disabled"
-        if interlocked:
-            self._attr_extra_state_attributes["Status"] = "Interlocked"
+        self._last_state = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state when the device turns on or off, the run times
+        and status are written by their own sensors"""
+        state = (self.available, self.is_on)
+        if state == self._last_state:
+            return
+        self._last_state = state
+        self.async_write_ha_state()
 
     @property
     def is_on(self) -> bool:
         """Return True if entity is on."""
-        self.update_time_attrs()
         return self.coordinator.get_bool(self._s7_is_on)
 
     async def async_turn_on(self, **kwargs):
@@ -0,0 +1,56 @@
+"""Tag map of the Step7 PLC integration, the entities defined in const.py."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import importlib
+
+from . import const
+
+
+@dataclass(frozen=True)
+class S7TagMap:
+    """The entity descriptions that define what is read from the PLC"""
+
+    covers: tuple[const.HAGenericEntityDescription, ...] = ()
+    device2s: tuple[const.HAGenericEntityDescription, ...] = ()
+    watering_areas: tuple[const.HAWateringAreaDescription, ...] = ()
+    sensors: tuple[const.S7SensorEntityDescription, ...] = ()
+    cover_layout: const.S7DeviceLayout = None
+    device2_layout: const.S7DeviceLayout = None
+    interlocks: tuple[const.S7Interlocks, ...] = ()
+
+    @property
+    def devices(self) -> tuple[const.HAGenericEntityDescription, ...]:
+        """Covers and devices, which share the interlock and status layout"""
+        return self.covers + self.device2s
+
+    def db_sizes(self) -> dict[int, int]:
+        """Bytes to read from the start of each DB used by the tags"""
+        sizes = {}
+        for desc in self.devices + self.watering_areas:
+            sizes[desc.s7datablock] = max(
+                sizes.get(desc.s7datablock, 0), desc.s7readbytes
+            )
+        for desc in self.sensors:
+            sizes[desc.s7datablock] = max(
+                sizes.get(desc.s7datablock, 0), desc.s7address + 4
+            )
+        return sizes
+
+
+def load_tag_map(reload: bool = False) -> S7TagMap:
+    """Tag map as defined in const.py, re-reading the module if reload is set.
+    Reloading does file I/O so it must be run in the executor.
+
+    Names imported from const by other modules keep the objects of the first
+    load, so everything the entities are built from is read through the map"""
+    module = importlib.reload(const) if reload else const
+    return S7TagMap(
+        covers=module.HA_COVER_ENTITIES,
+        device2s=module.HA_DEVICE2_ENTITIES,
+        watering_areas=module.HA_WATERING_AREAS,
+        sensors=module.SENSOR_REAL_ENTITIES,
+        cover_layout=module.COVER_LAYOUT,
+        device2_layout=module.DEVICE2_LAYOUT,
+        interlocks=tuple(module.interlock_template),
+    )
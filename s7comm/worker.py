@@ -0,0 +1,192 @@
+"""Run the S7Comm snap7 client in a separate worker process."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from .s7comm import S7Bytes, S7Comm
+
+_LOGGER = logging.getLogger(__name__)
+
+# Area images are double buffered, the worker writes one bank while
+# entities keep reading the data adopted from the other
+BANK_SIZE = 64 * 1024
+BANK_COUNT = 2
+
+# Longest a call may take before the worker is assumed hung and restarted
+CALL_TIMEOUT = 10.0
+
+UPDATE_DBS = "update_dbs"
+
+
+class S7CommWorker:
+    """S7Comm running in a worker process.
+
+    Commands and replies are exchanged over a pipe, read asynchronously from
+    the event loop. Area images are written by the worker into shared memory
+    and handed to the coordinator as memoryviews, without being copied. If
+    the worker hangs in native code or dies it is killed and restarted on the
+    next call.
+    """
+
+    def __init__(self, hass: HomeAssistant, ip_address: str) -> None:
+        self._hass = hass
+        self._ip_address = ip_address
+        self._shm = shared_memory.SharedMemory(create=True, size=BANK_SIZE * BANK_COUNT)
+        # Bank viewed by the data of the coordinator, and the bank of the last
+        # good update until the coordinator adopts it
+        self._adopted = BANK_COUNT - 1
+        self._written: int = None
+        self._process = None
+        self._conn = None
+        self._lock = asyncio.Lock()
+
+    async def call(self, method: str, *args) -> Any:
+        """Call the S7Comm method in the worker, returning its result"""
+        async with self._lock:
+            return await self._call(method, *args)
+
+    async def update_dbs(
+        self, read_areas: dict[str, S7Bytes]
+    ) -> tuple[bool, str, dict[str, memoryview]]:
+        """Read all the areas, returning the comms status, cpu state and
+        a view of each area's image in shared memory. The bank is only moved
+        on once the coordinator adopts the images, so a failed update is
+        retried into the same bank and never into the one being viewed"""
+        async with self._lock:
+            bank = (self._adopted + 1) % BANK_COUNT
+            self._written = None
+            comms_status, cpu_state, layout = await self._call(
+                UPDATE_DBS, bank, read_areas
+            )
+            if comms_status:
+                self._written = bank
+
+        images = {
+            key: None if pos is None else self._shm.buf[pos[0] : pos[0] + pos[1]]
+            for key, pos in layout.items()
+        }
+        return comms_status, cpu_state, images
+
+    def adopt(self) -> None:
+        """The images of the last update are now the data of the coordinator,
+        so the next update is written into another bank"""
+        if self._written is not None:
+            self._adopted = self._written
+            self._written = None
+
+    async def async_stop(self) -> None:
+        """Stop the worker and release the shared memory"""
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._stop)
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views are still held by entities, they are released with them
+            pass
+        self._shm.unlink()
+
+    async def _call(self, method: str, *args) -> Any:
+        if self._process is None or not self._process.is_alive():
+            if self._process is not None:
+                _LOGGER.warning("Step7 PLC worker exited, restarting")
+            await self._hass.async_add_executor_job(self._start)
+
+        try:
+            self._conn.send((method, args))
+            return await asyncio.wait_for(self._recv(), CALL_TIMEOUT)
+        except (asyncio.TimeoutError, EOFError, OSError) as err:
+            _LOGGER.warning("Step7 PLC worker not responding, restarting: %s", err)
+            await self._hass.async_add_executor_job(self._stop)
+            raise HomeAssistantError("Step7 PLC worker not responding") from err
+
+    async def _recv(self) -> Any:
+        """Wait for the reply without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fileno = self._conn.fileno()
+        loop.add_reader(fileno, lambda: readable.done() or readable.set_result(None))
+        try:
+            await readable
+        finally:
+            loop.remove_reader(fileno)
+
+        reply = self._conn.recv()
+        if isinstance(reply, Exception):
+            raise HomeAssistantError(f"Step7 PLC worker error: {reply}")
+        return reply
+
+    def _start(self) -> None:
+        context = multiprocessing.get_context("spawn")
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main,
+            args=(child_conn, self._ip_address, self._shm.name),
+            name=f"s7comm {self._ip_address}",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+    def _stop(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.join(CALL_TIMEOUT)
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+
+def _worker_main(conn, ip_address: str, shm_name: str) -> None:
+    """Worker process loop, executing calls until the pipe is closed"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    s7comm = S7Comm(ip_address)
+    while True:
+        try:
+            method, args = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        try:
+            if method == UPDATE_DBS:
+                reply = _update_dbs(s7comm, shm, *args)
+            else:
+                reply = getattr(s7comm, method)(*args)
+        except Exception as err:  # pylint: disable=broad-except
+            reply = err
+        conn.send(reply)
+
+    shm.close()
+
+
+def _update_dbs(
+    s7comm: S7Comm, shm: shared_memory.SharedMemory, bank: int, read_areas: dict
+) -> tuple[bool, str, dict[str, tuple[int, int]]]:
+    """Read the areas and copy their images into the bank of shared memory"""
+    s7comm.set_read_areas(read_areas)
+    s7comm.update_dbs()
+    if not s7comm.comms_status:
+        return False, None, {}
+    cpu_state = s7comm.get_cpu_state()
+
+    layout = {}
+    offset = bank * BANK_SIZE
+    for key, data in s7comm.get_db_data().items():
+        if data is None:
+            layout[key] = None
+            continue
+        if offset + len(data) > (bank + 1) * BANK_SIZE:
+            raise ValueError("Step7 PLC areas exceed the worker shared memory")
+        shm.buf[offset : offset + len(data)] = data
+        layout[key] = (offset, len(data))
+        offset += len(data)
+
+    return True, cpu_state, layout
@@ -0,0 +1,270 @@
+"""Benchmark the AirTouch 3 integration against the console simulator.
+
+Measures the poll latency of the client, and of several consoles polled
+together, the time from a command to the status confirming it through the
+coordinator, and how many entity state updates a second the snapshot and
+entity properties can process. Run from the
+repository root, Home Assistant must be installed for the coordinator and
+entity benchmarks:
+    python sandbox/airtouch3_benchmark.py --groups 8 --latency 0.02
+"""
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from airtouch3_simulator import AT3Simulator, SimConsole
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_integration():
+    """Register the integration as a package, its directory name clashes with
+    the airtouch3 library it uses. Its __init__ is only run by
+    init_integration, so the client can be used without Home Assistant"""
+    path = os.path.join(REPO, "airtouch3")
+    spec = importlib.util.spec_from_file_location(
+        "at3_integration",
+        os.path.join(path, "__init__.py"),
+        submodule_search_locations=[path],
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    return module
+
+
+def init_integration(module) -> None:
+    module.__spec__.loader.exec_module(module)
+
+
+def summary(samples: list) -> dict:
+    """Mean and percentiles of the samples in seconds, reported in ms"""
+    samples = sorted(samples)
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95)] * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+    }
+
+
+async def bench_poll(client, polls: int) -> dict:
+    """Status request round trips on the persistent connection"""
+    timings, failures = [], 0
+    for _ in range(polls):
+        start = time.perf_counter()
+        if not await client.update_status():
+            failures += 1
+            continue
+        timings.append(time.perf_counter() - start)
+    return {**summary(timings), "failures": failures}
+
+
+async def bench_consoles(client_module, args) -> dict:
+    """Poll several consoles at once through one shared scheduler, the nth
+    console answering n times slower than the first. A poll of all of them
+    should take about as long as the slowest, not the sum"""
+    scheduler_module = importlib.import_module("at3_integration.scheduler")
+    scheduler = scheduler_module.AT3Scheduler()
+    simulators, clients = [], []
+    for num in range(args.consoles):
+        simulator = AT3Simulator(
+            SimConsole.create(args.ac_units, args.groups, args.sensors),
+            latency=args.latency * (num + 1),
+        )
+        await simulator.start()
+        simulators.append(simulator)
+        clients.append(
+            client_module.AT3Client("127.0.0.1", simulator.port, scheduler=scheduler)
+        )
+
+    slowest = (await bench_poll(clients[-1], args.polls))["mean_ms"]
+    timings = []
+    for _ in range(args.polls):
+        start = time.perf_counter()
+        await asyncio.gather(*(client.update_status() for client in clients))
+        timings.append(time.perf_counter() - start)
+
+    for client, simulator in zip(clients, simulators):
+        await client.close()
+        await simulator.stop()
+    return {
+        "consoles": args.consoles,
+        "slowest_console_mean_ms": slowest,
+        "all_consoles": summary(timings),
+    }
+
+
+async def bench_commands(coordinator, console: SimConsole, rounds: int) -> dict:
+    """Time from each command to the status reply confirming it"""
+    results = {"ac_toggle": [], "ac_setpoint": [], "group_position": []}
+    failures = 0
+    for num in range(rounds):
+        start = time.perf_counter()
+        ok = await coordinator.async_issue_command(
+            coordinator.CMD_AC_TOGGLE, **{coordinator.IDX: 0}
+        )
+        ok = ok and coordinator.snapshot.ac_units[0].is_on == console.ac_units[0].is_on
+        results["ac_toggle"].append(time.perf_counter() - start)
+        failures += not ok
+
+        target = 18 if num % 2 else 28
+        start = time.perf_counter()
+        ok = await coordinator.async_set_ac_temperature(0, target)
+        results["ac_setpoint"].append(time.perf_counter() - start)
+        failures += not ok
+
+        # Fully closed to open, or back, the most steps a move can take
+        target = 0 if num % 2 else 100
+        start = time.perf_counter()
+        ok = await coordinator.async_set_group_position(0, target)
+        results["group_position"].append(time.perf_counter() - start)
+        failures += not ok
+
+    return {
+        **{name: summary(timings) for name, timings in results.items()},
+        "failures": failures,
+    }
+
+
+async def bench_entities(coordinator, hass, integration, frames: int) -> dict:
+    """Status frames processed into entity states, alternating between two
+    frames so every group and AC unit changes on each"""
+    climate = importlib.import_module(f"{integration.__name__}.climate")
+    cover = importlib.import_module(f"{integration.__name__}.cover")
+    entry = SimpleNamespace(entry_id="benchmark")
+    hass.data.setdefault(integration.DOMAIN, {})[entry.entry_id] = coordinator
+
+    entities = []
+    for platform in (climate, cover):
+        await platform.async_setup_entry(hass, entry, entities.extend)
+    for num, entity in enumerate(entities):
+        entity.hass = hass
+        entity.entity_id = f"{type(entity).__name__.lower()}.benchmark_{num}"
+
+    status = coordinator.client.at3
+    console = SimConsole.create(
+        len(status.ac_units), len(status.groups), len(status.sensors)
+    )
+    frame_a = console.response()
+    for group in console.groups:
+        group.percent = 20 - group.percent
+        group.is_on = not group.is_on
+    for ac_unit in console.ac_units:
+        ac_unit.temperature_sp += 1
+        ac_unit.temperature += 1
+    frame_b = console.response()
+
+    updates = 0
+    start = time.perf_counter()
+    for num in range(frames):
+        status._process_response(frame_b if num % 2 else frame_a)
+        coordinator._update_snapshot()
+        for entity in entities:
+            if entity.coordinator_context not in coordinator.changed:
+                continue
+            # What writing the state reads from the entity
+            entity.state
+            entity.capability_attributes
+            entity.state_attributes
+            entity.extra_state_attributes
+            entity.device_info
+            entity.name
+            entity.unique_id
+            updates += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "entities": len(entities),
+        "frames": frames,
+        "entity_updates": updates,
+        "frames_per_s": round(frames / elapsed, 1),
+        "entity_updates_per_s": round(updates / elapsed, 1),
+    }
+
+
+async def create_hass():
+    """Bare Home Assistant instance, enough to run a coordinator"""
+    from homeassistant.core import HomeAssistant
+
+    return HomeAssistant(tempfile.mkdtemp())
+
+
+async def main(args) -> dict:
+    simulator = AT3Simulator(
+        SimConsole.create(args.ac_units, args.groups, args.sensors),
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop,
+        seed=args.seed,
+    )
+    await simulator.start()
+
+    integration = load_integration()
+    client_module = importlib.import_module(f"{integration.__name__}.client")
+    client = client_module.AT3Client("127.0.0.1", simulator.port)
+    results = {
+        "config": vars(args),
+        "poll": await bench_poll(client, args.polls),
+    }
+    if args.consoles > 1:
+        results["consoles"] = await bench_consoles(client_module, args)
+
+    try:
+        hass = await create_hass()
+        init_integration(integration)
+    except ImportError:
+        hass = None
+        print("Home Assistant not installed, skipping coordinator benchmarks")
+
+    if hass is not None:
+        coordinator = integration.AT3DataUpdateCoordinator(hass, client)
+        await coordinator.async_refresh()
+        results["commands"] = await bench_commands(
+            coordinator, simulator.console, args.rounds
+        )
+        results["entities"] = await bench_entities(
+            coordinator, hass, integration, args.frames
+        )
+        await coordinator.async_shutdown()
+        await hass.async_stop(force=True)
+
+    results["simulator"] = {
+        "requests": simulator.requests,
+        "dropped": simulator.dropped,
+    }
+    await client.close()
+    await simulator.stop()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ac-units", type=int, default=1)
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--sensors", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Seconds")
+    parser.add_argument("--drop", type=float, default=0.0, help="Reply drop rate")
+    parser.add_argument("--consoles", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--polls", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--output", help="Also write the results as JSON here")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
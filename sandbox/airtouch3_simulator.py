@@ -0,0 +1,228 @@
+"""Stand-in for a Polyaire AirTouch 3 console, speaking its TCP protocol.
+
+Answers status requests and group/AC unit commands with the 492 byte status
+response, the same as the console. The AC units, groups and sensors are
+configurable, as is a latency added to each reply and the chance of a reply
+being dropped, to test how the integration copes with a slow console.
+
+Run standalone, then add the integration with host 127.0.0.1:
+    python sandbox/airtouch3_simulator.py --groups 6 --latency 0.05 --drop 0.01
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+import random
+
+from airtouch3 import constants as const
+from airtouch3.helper import calculate_checksum
+
+COMMAND_LEN = 13
+AC_SP_MIN, AC_SP_MAX = 16, 32
+GROUP_SP_MIN, GROUP_SP_MAX = 16, 32
+GROUP_PERCENT_MAX = 20  # In 5% steps
+
+
+@dataclass
+class SimAcUnit:
+    name: str
+    is_on: bool = False
+    has_error: bool = False
+    mode: int = 4  # Cool
+    fan_speed: int = 1  # Low
+    temperature: int = 24
+    temperature_sp: int = 22
+    brand: int = 8
+
+
+@dataclass
+class SimGroup:
+    name: str
+    is_on: bool = True
+    temperature_control: bool = False
+    percent: int = 10  # In 5% steps
+    temperature_sp: int = 22
+
+
+@dataclass
+class SimConsole:
+    """State of the simulated console"""
+
+    name: str = "Sim AirTouch"
+    id: str = "12345678"
+    ac_units: list = field(default_factory=list)
+    groups: list = field(default_factory=list)
+    sensors: list = field(default_factory=list)
+    touch_pad_group: int = 1  # 1 based, 0 for none
+    touch_pad_temperature: int = 23
+
+    @classmethod
+    def create(cls, ac_units: int = 1, groups: int = 4, sensors: int = 2):
+        return cls(
+            ac_units=[SimAcUnit(f"AC {n + 1}") for n in range(min(ac_units, 2))],
+            groups=[SimGroup(f"Zone {n + 1}") for n in range(min(groups, 16))],
+            sensors=[21 + n for n in range(min(sensors, const.TEMP_SENSOR_LEN))],
+        )
+
+    def apply(self, command: bytes) -> None:
+        """Apply a command, ignoring any that are invalid"""
+        byte1, byte3, byte4, byte5 = command[1], command[3], command[4], command[5]
+        if byte1 == const.CMD_1_GRP_CTRL and byte3 < len(self.groups):
+            self._apply_group(self.groups[byte3], byte4, byte5)
+        elif byte1 == const.CMD_1_AC_CTRL and byte3 < len(self.ac_units):
+            self._apply_ac_unit(self.ac_units[byte3], byte4, byte5)
+
+    def _apply_group(self, group: SimGroup, byte4: int, byte5: int) -> None:
+        if byte4 == const.CMD_4_TOGGLE and byte5 == 0:
+            group.is_on = not group.is_on
+        elif byte4 == const.CMD_4_TOGGLE and byte5 == 1:
+            group.temperature_control = not group.temperature_control
+        elif byte4 in (const.CMD_4_GRP_POSINC, const.CMD_4_GRP_POSDEC):
+            step = 1 if byte4 == const.CMD_4_GRP_POSINC else -1
+            if group.temperature_control:
+                group.temperature_sp = _clamp(
+                    group.temperature_sp + step, GROUP_SP_MIN, GROUP_SP_MAX
+                )
+            else:
+                group.percent = _clamp(group.percent + step, 0, GROUP_PERCENT_MAX)
+
+    def _apply_ac_unit(self, ac_unit: SimAcUnit, byte4: int, byte5: int) -> None:
+        if byte4 == const.CMD_4_TOGGLE:
+            ac_unit.is_on = not ac_unit.is_on
+        elif byte4 == const.CMD_4_AC_MODE:
+            ac_unit.mode = byte5
+        elif byte4 == const.CMD_4_AC_FAN_SPD:
+            ac_unit.fan_speed = byte5
+        elif byte4 in (const.CMD_4_AC_TEMP_INC, const.CMD_4_AC_TEMP_DEC):
+            step = 1 if byte4 == const.CMD_4_AC_TEMP_INC else -1
+            ac_unit.temperature_sp = _clamp(
+                ac_unit.temperature_sp + step, AC_SP_MIN, AC_SP_MAX
+            )
+
+    def response(self) -> bytes:
+        """Status response, laid out as the airtouch3 library reads it"""
+        data = bytearray(const.RESPONSE_LEN)
+        data[const.DAOF_GRP_COUNT] = len(self.groups)
+        for num, group in enumerate(self.groups):
+            # Each group has the one zone of the same number
+            offset = const.DAOF_GRP_NAME + num * const.GRP_NAME_LEN
+            _put_str(data, offset, group.name, const.GRP_NAME_LEN)
+            data[const.DAOF_ZONE_STATE + num] = (0x80 if group.is_on else 0) | num % 8
+            data[const.DAOF_GRP_FIRSTZONE + num] = num << 4
+            data[const.DAOF_GRP_PERCENT + num] = (
+                0x80 if group.temperature_control else 0
+            ) | group.percent
+            data[const.DAOF_GRP_SETPOINT + num] = (group.temperature_sp - 1) & 0x1F
+
+        for num, ac_unit in enumerate(self.ac_units):
+            offset = const.DAOF_AC1_NAME + num * const.AC_NAME_LEN
+            _put_str(data, offset, ac_unit.name, const.AC_NAME_LEN)
+            data[const.DAOF_AC1_STATUS + num] = (0x80 if ac_unit.is_on else 0) | (
+                0x40 if ac_unit.has_error else 0
+            )
+            data[const.DAOF_AC1_MODE + num] = ac_unit.mode
+            data[const.DAOF_AC1_FAN + num] = ac_unit.fan_speed
+            data[const.DAOF_AC1_TEMP_SP + num] = ac_unit.temperature_sp & 0x3F
+            data[const.DAOF_AC1_TEMP_PV + num] = ac_unit.temperature
+            data[const.DAOF_AC1_BRAND + num] = ac_unit.brand
+
+        data[const.DAOF_TP_GRP_ID] = self.touch_pad_group
+        data[const.DAOF_TP_TEMP] = 0x80 | self.touch_pad_temperature
+        for num, temperature in enumerate(self.sensors):
+            data[const.DAOF_TEMP_SENSORS + num] = 0x80 | temperature
+
+        _put_str(data, const.DAOF_SYS_NAME, self.name, const.SYS_NAME_LEN)
+        _put_str(data, const.DAOF_SYS_ID, self.id, const.SYS_ID_LEN)
+        return bytes(data)
+
+
+class AT3Simulator:
+    """TCP server answering as the console would, with optional faults"""
+
+    def __init__(
+        self,
+        console: SimConsole = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        drop_rate: float = 0.0,
+        seed: int = None,
+    ) -> None:
+        self.console = console or SimConsole.create()
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.requests = 0
+        self.dropped = 0
+        self._random = random.Random(seed)
+        self._server: asyncio.AbstractServer = None
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self._server = await asyncio.start_server(self._handle, host, port)
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                command = await reader.readexactly(COMMAND_LEN)
+                self.requests += 1
+                if bytes(command[-1:]) != calculate_checksum(command[:-1]):
+                    continue
+                self.console.apply(command)
+
+                delay = self.latency + self._random.uniform(0, self.jitter)
+                if delay:
+                    await asyncio.sleep(delay)
+                if self._random.random() < self.drop_rate:
+                    self.dropped += 1
+                    continue
+                writer.write(self.console.response())
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def _put_str(data: bytearray, offset: int, value: str, length: int) -> None:
+    data[offset : offset + length] = value.encode()[:length].ljust(length, b"\x00")
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(high, value))
+
+
+async def main(args) -> None:
+    simulator = AT3Simulator(
+        SimConsole.create(args.ac_units, args.groups, args.sensors),
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop,
+    )
+    await simulator.start(args.host, args.port)
+    print(f"AirTouch 3 simulator listening on {args.host}:{simulator.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--ac-units", type=int, default=1)
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--sensors", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Seconds")
+    parser.add_argument("--drop", type=float, default=0.0, help="Reply drop rate")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
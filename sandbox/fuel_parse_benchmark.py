@@ -0,0 +1,139 @@
+"""Benchmark parsing a large fuel price response, all at once vs streamed.
+
+Builds a synthetic response of many stations, then compares loading it whole
+with json.loads against FuelDataParser fed in chunks, keeping only a few
+tracked stations and fuel types, and as the shared cache keeps them, every
+station cut down to its record's fields and the tracked fuel types. Reports
+the time and peak memory of each:
+    python sandbox/fuel_parse_benchmark.py --stations 5000 --tracked 10
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import time
+import tracemalloc
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FUEL_TYPES = ["U91", "E10", "P95", "P98", "Diesel", "Premium Diesel", "LPG"]
+BRANDS = ["Ampol", "BP", "Shell", "7-Eleven", "Puma", "United", "Liberty"]
+CHUNK_SIZE = 65536
+
+
+def load_parser():
+    """The parser module on its own, without Home Assistant"""
+    spec = importlib.util.spec_from_file_location(
+        "fuel_parser", os.path.join(REPO, "aus_fuel", "parser.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_response(stations: int, seed: int) -> bytes:
+    rand = random.Random(seed)
+    data = []
+    for num in range(stations):
+        brand = rand.choice(BRANDS)
+        data.append(
+            {
+                "station": {
+                    "name": f"{brand} Station {num}",
+                    "address": f"{num} Example Road, Suburb QLD 4000",
+                    "brand": brand,
+                    "location": {
+                        "latitude": -27.5 + rand.uniform(-0.5, 0.5),
+                        "longitude": 153.0 + rand.uniform(-0.5, 0.5),
+                    },
+                    "prices": [
+                        {"type": fuel_type, "price": round(rand.uniform(150, 230), 1)}
+                        for fuel_type in FUEL_TYPES
+                        if rand.random() < 0.8
+                    ],
+                }
+            }
+        )
+    return json.dumps({"message": "ok", "data": data}).encode()
+
+
+def measure(parse) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    kept = parse()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "time_ms": round(elapsed * 1000, 1),
+        "peak_kib": round(peak / 1024),
+        "prices_kept": sum(len(entry["station"]["prices"]) for entry in kept),
+    }
+
+
+def main(args) -> None:
+    parser_module = load_parser()
+    raw = synthetic_response(args.stations, args.seed)
+    stations = {
+        entry["station"]["name"].replace(" ", "_")
+        for entry in json.loads(raw)["data"][: args.tracked]
+    }
+    fuel_types = set(FUEL_TYPES[: args.fuel_types])
+
+    def keep(entry):
+        station = entry["station"]
+        if station["name"].replace(" ", "_") not in stations:
+            return None
+        station["prices"] = [
+            price for price in station["prices"] if price["type"] in fuel_types
+        ]
+        return entry if station["prices"] else None
+
+    def keep_cached(entry):
+        # As AusFuelAPI keeps the stations of a tile
+        station = entry["station"]
+        location = station["location"]
+        return {
+            "station": {
+                "name": station["name"],
+                "address": station["address"],
+                "brand": station["brand"],
+                "location": {
+                    "latitude": location["latitude"],
+                    "longitude": location["longitude"],
+                },
+                "prices": [
+                    price for price in station["prices"] if price["type"] in fuel_types
+                ],
+            }
+        }
+
+    def whole():
+        # Everything is loaded, then filtered
+        data = json.loads(raw)["data"]
+        return [entry for entry in data if keep(entry) is not None]
+
+    def streamed(keep_entry):
+        parser = parser_module.FuelDataParser(keep_entry)
+        for pos in range(0, len(raw), CHUNK_SIZE):
+            parser.feed(raw[pos : pos + CHUNK_SIZE])
+        parser.close()
+        return parser.data
+
+    results = {
+        "response_kib": round(len(raw) / 1024),
+        "stations": args.stations,
+        "whole": measure(whole),
+        "streamed": measure(lambda: streamed(keep)),
+        "cached": measure(lambda: streamed(keep_cached)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=5000)
+    parser.add_argument("--tracked", type=int, default=10, help="Stations kept")
+    parser.add_argument("--fuel-types", type=int, default=2, help="Types kept")
+    parser.add_argument("--seed", type=int, default=1)
+    main(parser.parse_args())